@@ -1,12 +1,75 @@
+import atexit
 import os
+import threading
 from pymongo import MongoClient
+from pymongo import monitoring
 from urllib.parse import quote_plus
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Đếm số kết nối được mở/đóng để kiểm chứng việc tái sử dụng pool"""
+
+    def __init__(self, stats, lock):
+        self._stats = stats
+        self._lock = lock
+
+    def _incr(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def pool_created(self, event):
+        self._incr('pools_created')
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_opened')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        self._incr('checkouts')
+
+    def connection_checked_in(self, event):
+        pass
+
+
 class MongoDBConfig:
+    # MongoClient dùng chung cho cả process (lazy, thread-safe, fork-safe)
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    _stats_lock = threading.Lock()
+    _stats = {
+        'clients_created': 0,
+        'pools_created': 0,
+        'pools_cleared': 0,
+        'connections_opened': 0,
+        'connections_closed': 0,
+        'checkouts': 0
+    }
+
     def __init__(self):
         # Cấu hình MongoDB
         self.host = os.getenv('MONGO_HOST', 'localhost')
@@ -14,21 +77,33 @@ class MongoDBConfig:
         self.database = os.getenv('MONGO_DATABASE', 'financial_analysis')
         self.username = os.getenv('MONGO_USERNAME', '')
         self.password = os.getenv('MONGO_PASSWORD', '')
-        
+
+        # Cấu hình connection pool
+        self.pool_options = {
+            'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', 50)),
+            'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', 0)),
+            'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000)),
+            'heartbeatFrequencyMS': int(os.getenv('MONGO_HEARTBEAT_FREQUENCY_MS', 10000)),
+            'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000))
+        }
+
         # Collections
         self.collections = {
             'news': 'news_articles',
             'processed': 'processed_articles',
             'models': 'ml_models',
-            'predictions': 'predictions'
+            'predictions': 'predictions',
+            'contents': 'article_contents',
+            'url_analyses': 'url_analyses'
         }
-    
+
     def get_connection_string(self):
         # Uu tien dung connection string tu .env
         connection_string = os.getenv('MONGO_CONNECTION_STRING')
         if connection_string:
             return connection_string
-        
+
         # Fallback sang cau hinh local
         if self.username and self.password:
             username = quote_plus(self.username)
@@ -36,23 +111,49 @@ class MongoDBConfig:
             return f"mongodb://{username}:{password}@{self.host}:{self.port}/{self.database}"
         else:
             return f"mongodb://{self.host}:{self.port}/{self.database}"
-    
+
     def get_client(self):
-        try:
-            client = MongoClient(self.get_connection_string())
-            # Test connection
-            client.admin.command('ping')
+        """Trả về MongoClient dùng chung, chỉ tạo (và ping) ở lần gọi đầu tiên"""
+        cls = MongoDBConfig
+        client = cls._client
+        if client is not None and cls._client_pid == os.getpid():
             return client
-        except Exception as e:
-            print(f"Loi ket noi MongoDB: {e}")
-            return None
-    
+
+        with cls._client_lock:
+            # Sau khi fork (gunicorn worker) không được dùng lại client của process cha
+            if cls._client is not None and cls._client_pid != os.getpid():
+                cls._client = None
+
+            if cls._client is None:
+                client = None
+                try:
+                    client = MongoClient(
+                        self.get_connection_string(),
+                        event_listeners=[_PoolStatsListener(cls._stats, cls._stats_lock)],
+                        **self.pool_options
+                    )
+                    # Test connection
+                    client.admin.command('ping')
+                except Exception as e:
+                    print(f"Loi ket noi MongoDB: {e}")
+                    # Không giữ client lỗi: đóng luôn pool và thread monitor của nó
+                    if client is not None:
+                        client.close()
+                    return None
+
+                cls._client = client
+                cls._client_pid = os.getpid()
+                with cls._stats_lock:
+                    cls._stats['clients_created'] += 1
+
+            return cls._client
+
     def get_database(self):
         client = self.get_client()
         if client is not None:
             return client[self.database]
         return None
-    
+
     def get_collection(self, collection_name):
         db = self.get_database()
         if db is not None:
@@ -61,4 +162,38 @@ class MongoDBConfig:
             else:
                 # Fallback cho collection name trực tiếp
                 return db[collection_name]
-        return None
\ No newline at end of file
+        return None
+
+    @classmethod
+    def get_pool_stats(cls):
+        """Thống kê kết nối của process hiện tại"""
+        with cls._stats_lock:
+            stats = dict(cls._stats)
+        stats['pid'] = os.getpid()
+        stats['client_active'] = cls._client is not None and cls._client_pid == os.getpid()
+        return stats
+
+    @classmethod
+    def close_client(cls):
+        """Đóng client dùng chung (dùng khi shutdown)"""
+        with cls._client_lock:
+            if cls._client is not None and cls._client_pid == os.getpid():
+                cls._client.close()
+            cls._client = None
+            cls._client_pid = None
+
+    @classmethod
+    def _reset_after_fork(cls):
+        # Process con tạo client và bộ đếm mới, không đóng socket của process cha
+        cls._client = None
+        cls._client_pid = None
+        cls._client_lock = threading.Lock()
+        cls._stats_lock = threading.Lock()
+        cls._stats = {key: 0 for key in cls._stats}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=MongoDBConfig._reset_after_fork)
+
+# Đóng pool khi process thoát (lần ghi sau đó, nếu có, sẽ tạo client mới)
+atexit.register(MongoDBConfig.close_client)
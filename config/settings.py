@@ -11,6 +11,10 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = BASE_DIR / 'logs'
 LOG_DIR.mkdir(exist_ok=True)
 
+# Diagnostics: log DEBUG của code ứng dụng (payload nặng như mẫu DataFrame) vào app.log
+LOG_DIAGNOSTICS = os.getenv('LOG_DIAGNOSTICS', 'false').lower() == 'true'
+
+# Handler file/console chạy sau QueueListener (src/utils/logging_utils.py)
 LOG_CONFIG = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -21,7 +25,7 @@ LOG_CONFIG = {
     },
     'handlers': {
         'file': {
-            'level': 'INFO',
+            'level': 'DEBUG',
             'class': 'logging.FileHandler',
             'filename': LOG_DIR / 'app.log',
             'formatter': 'standard',
@@ -37,6 +41,10 @@ LOG_CONFIG = {
             'handlers': ['console', 'file'],
             'level': 'INFO',
             'propagate': True
+        },
+        'src': {
+            'level': 'DEBUG' if LOG_DIAGNOSTICS else 'INFO',
+            'propagate': True
         }
     }
 }
@@ -111,7 +119,71 @@ SECTOR_MAPPINGS = {
 # Performance Settings
 PERFORMANCE_CONFIG = {
     'cache_timeout': 300,  # 5 minutes
+    'cache_max_entries': 256,  # Số entry tối đa của dashboard_cache (LRU)
+    'cache_max_bytes': int(os.getenv('CACHE_MAX_BYTES', 256 * 1024 * 1024)),  # Ngân sách bộ nhớ/đĩa của dashboard_cache
+    'cache_max_stale': 120,  # seconds: sau TTL vẫn trả dữ liệu cũ tối đa chừng này trong lúc làm mới nền
+    'figure_cache_max_entries': 128,  # Số figure Plotly đã dựng giữ trong mỗi process
+    'figure_cache_max_bytes': 32 * 1024 * 1024,
+    'cache_debug_view': os.getenv('CACHE_DEBUG_VIEW', 'false').lower() == 'true',  # Bật trang /debug/cache
+    'refresh_workers': 2,  # Số thread làm mới cache/frame ở nền
+    # memory: cache riêng từng process; file: dùng chung giữa các gunicorn worker trên cùng máy
+    'cache_backend': os.getenv('CACHE_BACKEND', 'memory'),
+    'cache_dir': os.getenv('CACHE_DIR', str(BASE_DIR / 'cache')),
     'max_articles_display': 50,
     'chart_update_interval': 30,  # seconds
-    'enable_caching': True
-}
\ No newline at end of file
+    'enable_caching': True,
+    'max_window_days': 90,  # Cửa sổ thời gian lớn nhất trên dashboard (time-filter)
+    'refresh_interval': 10,  # seconds, khoảng cách tối thiểu giữa hai lần tải bài mới
+    'refresh_overlap_seconds': 30,  # Lùi high-water mark để không sót bài ghi trễ
+    # Ngân sách bộ nhớ của processed_frame, vượt quá thì bỏ các bài crawl cũ nhất
+    'frame_max_bytes': int(os.getenv('FRAME_MAX_BYTES', 512 * 1024 * 1024))
+}
+
+# Database Write Settings
+DATABASE_CONFIG = {
+    'bulk_batch_size': 500,  # Số thao tác mỗi lần bulk_write
+    # crawl_time lưu theo UTC; múi giờ dùng cho giá trị không có tz, crawl_day và hiển thị
+    'timezone': os.getenv('APP_TIMEZONE', 'Asia/Ho_Chi_Minh')
+}
+
+# Write-behind queue cho các thao tác ghi từ dashboard/crawler
+WRITE_QUEUE_CONFIG = {
+    'max_size': 10000,     # Số bản ghi tối đa chờ ghi (backpressure khi đầy)
+    'flush_size': 500,     # Ghi ngay khi gom đủ số bản ghi này
+    'flush_interval': 2.0, # Hoặc sau số giây này
+    'put_timeout': 5.0     # Thời gian chờ khi queue đầy trước khi ghi đồng bộ
+}
+
+# Cache kết quả preprocess/sentiment theo hash nội dung (LRU trong process + SQLite trên đĩa)
+ANALYSIS_CACHE_CONFIG = {
+    'enabled': os.getenv('ANALYSIS_CACHE_ENABLED', 'true').lower() == 'true',
+    'max_entries': 2048,  # Số kết quả giữ trong bộ nhớ mỗi process
+    'max_bytes': 64 * 1024 * 1024,
+    'path': os.getenv('ANALYSIS_CACHE_PATH', str(BASE_DIR / 'cache' / 'analysis.sqlite3'))
+}
+
+# Lưu kết quả phân tích URL (collection url_analyses)
+URL_MEMO_CONFIG = {
+    'fresh_seconds': 3600,  # Trả kết quả đã lưu không cần kiểm tra lại URL
+    'ttl_days': 7           # Sau đó document tự bị xóa (TTL index)
+}
+
+# Biểu đồ timeline: độ dài bucket theo khoảng thời gian
+TIMELINE_CONFIG = {
+    'hourly_max_days': 2,   # Tới 2 ngày: theo giờ
+    'daily_max_days': 31    # Tới 31 ngày: theo ngày, dài hơn: theo tuần
+}
+
+# Nạp sẵn dữ liệu dashboard khi khởi động (/readyz trả 200 khi xong)
+WARMUP_CONFIG = {
+    'enabled': os.getenv('WARMUP_ENABLED', 'true').lower() == 'true',
+    'days': (30, 1, 7, 90)  # Các giá trị time-filter, 30 ngày (mặc định) trước
+}
+
+# Theo dõi thay đổi processed_articles để làm mới cache ở mọi process
+CHANGE_WATCHER_CONFIG = {
+    'enabled': os.getenv('CHANGE_WATCHER_ENABLED', 'true').lower() == 'true',
+    'mode': os.getenv('CHANGE_WATCHER_MODE', 'auto'),  # auto | change_stream | polling
+    'poll_interval': 5.0,  # seconds, chế độ polling theo processed_at
+    'debounce': 1.0        # Gom các thay đổi liên tiếp (bulk write) thành một lần làm mới
+}
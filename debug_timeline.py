@@ -6,35 +6,56 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pandas as pd
-from datetime import datetime, date
+from datetime import date
 from src.database.db_manager import DatabaseManager
+from src.utils.helpers import DAY_EPOCH, utc_to_local
 
 def debug_timeline():
     """Debug dữ liệu timeline"""
     
     db = DatabaseManager()
-    df = db.load_processed_data(limit=1000)
+    target_date = date(2025, 11, 10)
     
     print("=" * 80)
     print("📊 DATABASE DEBUG - TIMELINE")
     print("=" * 80)
     
-    if df.empty:
+    # Duyệt theo batch, chỉ giữ lại thống kê theo ngày và các bài của ngày cần kiểm tra
+    columns = ['title', 'source', 'crawl_time', 'crawl_day', 'predicted_label', 'predicted_sentiment']
+    total_records = 0
+    date_counts = pd.Series(dtype='int64')
+    nov_10_chunks = []
+    pending_records = 0
+    
+    for chunk in db.iter_processed(batch_size=1000, projection=columns):
+        total_records += len(chunk)
+        
+        # Ngày theo giờ địa phương giống timeline của dashboard: document đã chuẩn hóa
+        # lấy theo crawl_day (crawl_time là UTC), document chưa backfill giữ crawl_time cũ
+        if 'crawl_day' not in chunk.columns:
+            chunk['crawl_day'] = float('nan')
+        normalized = chunk['crawl_day'].notna()
+        pending_records += int((~normalized).sum())
+        crawl_time = pd.to_datetime(chunk['crawl_time'], errors='coerce')
+        chunk['crawl_time'] = crawl_time.where(~normalized, utc_to_local(crawl_time))
+        day_dates = (DAY_EPOCH + pd.to_timedelta(chunk['crawl_day'], unit='D')).dt.date
+        chunk['date'] = day_dates.where(normalized, chunk['crawl_time'].dt.date)
+        
+        date_counts = date_counts.add(chunk['date'].value_counts(), fill_value=0)
+        nov_10_chunks.append(chunk[chunk['date'] == target_date])
+    
+    if total_records == 0:
         print("❌ NO DATA in database!")
         return
     
-    print(f"\n✅ Total records: {len(df)}")
-    print(f"Columns: {df.columns.tolist()}")
-    
-    # Convert crawl_time
-    df['crawl_time'] = pd.to_datetime(df['crawl_time'], errors='coerce')
-    df['date'] = df['crawl_time'].dt.date
+    print(f"\n✅ Total records: {total_records}")
+    print(f"Columns: {columns}")
     
-    print(f"\n📅 Date range: {df['date'].min()} to {df['date'].max()}")
+    date_counts = date_counts.astype(int).sort_index()
+    print(f"\n📅 Date range: {date_counts.index.min()} to {date_counts.index.max()}")
     
     # Check ngày 10/11
-    target_date = date(2025, 11, 10)
-    nov_10 = df[df['date'] == target_date]
+    nov_10 = pd.concat(nov_10_chunks, ignore_index=True)
     
     print(f"\n🔍 Checking date: {target_date}")
     print(f"Records found: {len(nov_10)}")
@@ -64,23 +85,15 @@ def debug_timeline():
     else:
         print("❌ NO ARTICLES found for 10/11!")
         print("\nAvailable dates:")
-        for d in sorted(df['date'].unique())[-10:]:  # Last 10 dates
-            count = len(df[df['date'] == d])
+        for d, count in date_counts.tail(10).items():  # Last 10 dates
             print(f"  {d}: {count} bài")
     
-    # Check timezone issues
+    # Document chưa chuẩn hóa crawl_time không hiện trên dashboard
     print("\n🕐 Timezone check:")
-    print(f"Sample crawl_time dtypes: {df['crawl_time'].dtype}")
-    print(f"Has timezone: {df['crawl_time'].dt.tz is not None}")
+    print(f"Records chưa có crawl_day: {pending_records}")
     
-    if df['crawl_time'].dt.tz is not None:
-        print(f"⚠️ WARNING: Data has timezone info!")
-        print("Converting to local time...")
-        df['crawl_time_local'] = df['crawl_time'].dt.tz_convert('Asia/Ho_Chi_Minh')
-        df['date_local'] = df['crawl_time_local'].dt.date
-        
-        nov_10_local = df[df['date_local'] == target_date]
-        print(f"After timezone conversion: {len(nov_10_local)} records on 10/11")
+    if pending_records:
+        print("⚠️ WARNING: Chạy python scripts/backfill_crawl_time.py để chuẩn hóa crawl_time")
 
 if __name__ == "__main__":
     debug_timeline()
\ No newline at end of file
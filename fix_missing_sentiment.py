@@ -6,20 +6,20 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
 
-from config.database import MongoDBConfig
+from src.database.db_manager import DatabaseManager
+from src.database.schema import SCHEMA_VERSION
+from pymongo import UpdateOne
 from datetime import datetime
 
 def fix_missing_sentiment():
     """Fix predicted_sentiment bị null"""
-    config = MongoDBConfig()
-    db = config.get_database()
+    db_manager = DatabaseManager()
+    collection = db_manager.config.get_collection('processed_articles')
     
-    if db is None:
+    if collection is None:
         print("❌ Không thể kết nối database!")
         return
     
-    collection = db['processed_articles']
-    
     # Mapping
     sentiment_map = {
         0: 'Tiêu cực',
@@ -28,7 +28,9 @@ def fix_missing_sentiment():
     }
     
     # Find documents with null predicted_sentiment
+    # (schema v2 chỉ dùng predicted_label, xem scripts/migrate_schema.py)
     query = {
+        'schema_version': {'$ne': SCHEMA_VERSION},
         '$or': [
             {'predicted_sentiment': {'$exists': False}},
             {'predicted_sentiment': None},
@@ -37,16 +39,16 @@ def fix_missing_sentiment():
         ]
     }
     
-    docs_to_fix = list(collection.find(query))
+    total_to_fix = collection.count_documents(query)
     
-    print(f"📊 Found {len(docs_to_fix)} documents with missing predicted_sentiment")
+    print(f"📊 Found {total_to_fix} documents with missing predicted_sentiment")
     
-    if len(docs_to_fix) == 0:
+    if total_to_fix == 0:
         print("✅ All documents have predicted_sentiment!")
         return
     
     # Confirm
-    confirm = input(f"\n⚠️  Fix {len(docs_to_fix)} documents? (yes/no): ")
+    confirm = input(f"\n⚠️  Fix {total_to_fix} documents? (yes/no): ")
     if confirm.lower() != 'yes':
         print("❌ Cancelled")
         return
@@ -55,29 +57,37 @@ def fix_missing_sentiment():
     fixed_count = 0
     error_count = 0
     
-    for doc in docs_to_fix:
-        try:
-            predicted_label = doc.get('predicted_label')
-            
-            if predicted_label is not None and predicted_label in [0, 1, 2]:
-                predicted_sentiment = sentiment_map[predicted_label]
-                
-                collection.update_one(
-                    {'_id': doc['_id']},
-                    {'$set': {'predicted_sentiment': predicted_sentiment}}
-                )
-                
-                fixed_count += 1
-                
-                if fixed_count % 50 == 0:
-                    print(f"  Processed {fixed_count}/{len(docs_to_fix)}...")
+    # Duyệt theo batch, chỉ lấy _id và predicted_label, cập nhật bằng bulk_write
+    for chunk in db_manager.iter_processed(
+        batch_size=500,
+        projection=['_id', 'predicted_label'],
+        query=query,
+        sort=False
+    ):
+        if 'predicted_label' not in chunk.columns:
+            chunk['predicted_label'] = None
+        
+        operations = []
+        for doc_id, predicted_label in zip(chunk['_id'], chunk['predicted_label']):
+            if predicted_label in sentiment_map:
+                operations.append(UpdateOne(
+                    {'_id': doc_id},
+                    {'$set': {'predicted_sentiment': sentiment_map[predicted_label], 'updated_at': datetime.now()}}
+                ))
             else:
                 print(f"⚠️  Skipping doc with invalid predicted_label: {predicted_label}")
                 error_count += 1
-                
+        
+        if not operations:
+            continue
+        
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            fixed_count += result.modified_count
+            print(f"  Processed {fixed_count}/{total_to_fix}...")
         except Exception as e:
-            print(f"❌ Error fixing doc {doc.get('_id')}: {e}")
-            error_count += 1
+            print(f"❌ Error fixing batch: {e}")
+            error_count += len(operations)
     
     print(f"\n✅ Fixed {fixed_count} documents")
     print(f"⚠️  Errors: {error_count}")
@@ -2,27 +2,45 @@
 File chính chạy ứng dụng
 """
 import logging
-import logging.config
-from config.settings import LOG_CONFIG
+from config.settings import CHANGE_WATCHER_CONFIG, WARMUP_CONFIG
 from src.dashboard.app import app
 from src.dashboard.layouts import create_dashboard_layout, create_url_analysis_layout
-from src.dashboard.enhanced_callbacks import register_enhanced_callbacks
+from src.dashboard.enhanced_callbacks import register_enhanced_callbacks, invalidate_dashboard_data, add_warmup_steps
 from dash import dcc, html
 from dash.dependencies import Input, Output
 
 from src.dashboard.layouts import create_crawler_management_layout
 from src.dashboard.crawler_callbacks import register_crawler_callbacks
+from src.database.db_manager import DatabaseManager
+from src.services.change_watcher import change_watcher
+from src.services.warmup import warmup
+from src.utils.logging_utils import configure_logging
 
 # Đăng ký callback cho crawler
 register_crawler_callbacks(app)
 
 # Setup logging
-logging.config.dictConfig(LOG_CONFIG)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Register enhanced callbacks
 register_enhanced_callbacks(app)
 
+# Đảm bảo index cho các query dashboard
+DatabaseManager().ensure_indexes()
+
+# Làm mới cache khi processed_articles thay đổi (crawler, script, worker khác)
+if CHANGE_WATCHER_CONFIG['enabled']:
+    change_watcher.add_listener(invalidate_dashboard_data)
+    change_watcher.start()
+
+# Nạp sẵn dữ liệu ở thread nền, /readyz trả 503 cho tới khi xong
+if WARMUP_CONFIG['enabled']:
+    add_warmup_steps(warmup)
+    warmup.start()
+else:
+    warmup.mark_ready()
+
 # Layout chính với routing
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script chuẩn hóa crawl_time cho document cũ (xem normalize_crawl_time)
+
+- crawl_time (datetime giờ địa phương hoặc chuỗi) -> BSON date theo UTC
+- thêm crawl_day (số ngày kể từ 1970-01-01 theo DATABASE_CONFIG['timezone'])
+- crawl_time thiếu hoặc không đọc được: lấy processed_at/created_at
+
+Timestamp cũ không có múi giờ (kể cả datetime.now() mà phiên bản trước
+lưu thẳng vào MongoDB) được coi là giờ APP_TIMEZONE
+(DATABASE_CONFIG['timezone']). Nếu dữ liệu được crawl ở múi giờ khác,
+đặt APP_TIMEZONE tương ứng trước khi chạy script.
+
+Dashboard lọc crawl_time bằng range query, document chưa chuẩn hóa sẽ
+không hiện trên dashboard cho tới khi chạy script này.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.database.db_manager import DatabaseManager
+from src.database.schema import normalize_crawl_time
+
+COLLECTIONS = ('processed_articles', 'news_articles')
+
+# Document chưa có crawl_day hoặc crawl_time không phải date
+PENDING_QUERY = {'$or': [
+    {'crawl_day': {'$exists': False}},
+    {'crawl_time': {'$not': {'$type': 'date'}}}
+]}
+
+PROJECTION = {'crawl_time': 1, 'processed_at': 1, 'created_at': 1}
+
+def backfill_fields(doc):
+    """Các trường cần $set cho một document (crawl_time UTC, crawl_day, updated_at)"""
+    normalize_crawl_time(doc, fallback=doc.get('processed_at') or doc.get('created_at'))
+    return {'crawl_time': doc['crawl_time'], 'crawl_day': doc['crawl_day'], 'updated_at': datetime.now()}
+
+def backfill(collection_name, batch_size=1000, dry_run=False):
+    """Chuẩn hóa crawl_time của một collection, trả về số document đã cập nhật"""
+    db_manager = DatabaseManager()
+    collection = db_manager.config.get_collection(collection_name)
+
+    if collection is None:
+        print("❌ Không thể kết nối database!")
+        return 0
+
+    total = collection.count_documents(PENDING_QUERY)
+    print(f"📊 {collection_name}: {total:,} documents cần chuẩn hóa crawl_time")
+    if total == 0 or dry_run:
+        return 0
+
+    updated = 0
+    failed_ids = []
+    # Document đã cập nhật không còn khớp query, nên luôn đọc lại batch đầu tiên
+    while True:
+        batch_query = {'$and': [PENDING_QUERY, {'_id': {'$nin': failed_ids}}]} if failed_ids else PENDING_QUERY
+        docs = list(collection.find(batch_query, PROJECTION).limit(batch_size))
+        if not docs:
+            break
+
+        operations = [UpdateOne({'_id': doc['_id']}, {'$set': backfill_fields(doc)}) for doc in docs]
+
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        except BulkWriteError as e:
+            updated += e.details.get('nModified', 0)
+            for error in e.details.get('writeErrors', []):
+                failed_ids.append(docs[error['index']]['_id'])
+                print(f"⚠️  Bỏ qua document {docs[error['index']]['_id']}: {error.get('errmsg')}")
+
+        print(f"  Đã cập nhật {updated:,}/{total:,}...")
+
+    print(f"✅ {collection_name}: đã cập nhật {updated:,} documents")
+    if failed_ids:
+        print(f"⚠️  Lỗi: {len(failed_ids):,} documents")
+    return updated
+
+def main():
+    parser = argparse.ArgumentParser(description='Chuẩn hóa crawl_time về UTC và thêm crawl_day')
+    parser.add_argument('--collection', choices=COLLECTIONS, help='Chỉ xử lý một collection')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Số document mỗi lần bulk_write')
+    parser.add_argument('--dry-run', action='store_true', help='Chỉ đếm số document cần chuẩn hóa')
+
+    args = parser.parse_args()
+    for collection_name in ([args.collection] if args.collection else COLLECTIONS):
+        backfill(collection_name, batch_size=args.batch_size, dry_run=args.dry_run)
+
+if __name__ == "__main__":
+    main()
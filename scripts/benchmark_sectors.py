@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark chuẩn hóa sector: chuẩn hóa theo từng dòng (apply) so với
+normalize_sector_series (chỉ xử lý các giá trị khác nhau), và chỉ mục
+vị trí theo ngành (sector_positions, tính một lần mỗi lần refresh frame)
+so với mask bool phải tính lại mỗi lần lọc
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.database.schema import sector_codes
+from src.utils.helpers import VALID_SECTORS, normalize_sector, normalize_sector_series, sector_positions
+
+# Giá trị sectors giống dữ liệu thật: document cũ lưu chuỗi (mã tiếng Việt
+# hoặc tên tiếng Anh, phân tách bằng dấu phẩy), schema v2 lưu mảng
+LEGACY_VALUES = [
+    'Banking', 'ngân_hàng', 'bất_động_sản, ngân_hàng', 'Energy,Technology', 'công_nghệ',
+    'sản_xuất', 'Real Estate', 'Unknown', '', None, float('nan')
+]
+V2_VALUES = [['Banking'], ['Energy', 'Manufacturing'], ['Real Estate', 'Banking'], ['Technology'], ['Other']]
+
+def make_values(choices, rows, seed=42):
+    rng = random.Random(seed)
+    return pd.Series([rng.choice(choices) for _ in range(rows)], name='sectors')
+
+def primary_by_row(values):
+    """Cách theo từng dòng cho mảng v2: ngành đầu tiên của sector_codes"""
+    return values.apply(lambda value: sector_codes(value)[0])
+
+def masks_by_sector(sector):
+    """Cách không có chỉ mục: một mask bool cho mỗi ngành"""
+    return {name: (sector == name).to_numpy().nonzero()[0] for name in VALID_SECTORS}
+
+def timed(func, values, repeat):
+    """Thời gian tốt nhất (giây) trong repeat lần chạy"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(values)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark chuẩn hóa sector')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000], help='Số dòng cần đo')
+    parser.add_argument('--repeat', type=int, default=3, help='Số lần chạy mỗi phép đo')
+
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        legacy = make_values(LEGACY_VALUES, rows)
+        v2 = make_values(V2_VALUES, rows)
+
+        # Kết quả phải giống cách theo từng dòng
+        assert (legacy.apply(normalize_sector) == normalize_sector_series(legacy).astype(str)).all()
+        assert (primary_by_row(v2) == normalize_sector_series(v2).astype(str)).all()
+
+        apply_time = timed(lambda v: v.apply(normalize_sector), legacy, args.repeat)
+        series_time = timed(normalize_sector_series, legacy, args.repeat)
+        by_row_time = timed(primary_by_row, v2, args.repeat)
+        v2_series_time = timed(normalize_sector_series, v2, args.repeat)
+
+        # Chỉ mục theo ngành phải khớp với mask của từng ngành
+        sector = normalize_sector_series(legacy)
+        positions = sector_positions(sector)
+        for name, rows_of_sector in masks_by_sector(sector).items():
+            assert (positions.get(name, rows_of_sector[:0]) == rows_of_sector).all()
+
+        mask_time = timed(lambda s: (s == 'Banking').to_numpy().nonzero()[0], sector, args.repeat)
+        positions_time = timed(sector_positions, sector, args.repeat)
+
+        print(f"\n📊 {rows:,} dòng")
+        print("  Chuỗi cũ:")
+        print(f"    apply(normalize_sector):   {apply_time * 1000:9.1f} ms")
+        print(f"    normalize_sector_series:   {series_time * 1000:9.1f} ms  (x{apply_time / series_time:.0f})")
+        print("  Mảng v2:")
+        print(f"    apply(sector_codes)[0]:    {by_row_time * 1000:9.1f} ms")
+        print(f"    normalize_sector_series:   {v2_series_time * 1000:9.1f} ms  (x{by_row_time / v2_series_time:.0f})")
+        print("  Vị trí dòng theo ngành:")
+        print(f"    mask mỗi lần lọc:          {mask_time * 1000:9.1f} ms")
+        print(f"    sector_positions (1 lần):  {positions_time * 1000:9.1f} ms  (sau đó mỗi lần lọc chỉ là tra dict)")
+
+if __name__ == "__main__":
+    main()
@@ -11,6 +11,7 @@ from src.crawler.news_crawler import FinancialNewsCrawler
 from src.database.db_manager import DatabaseManager
 from src.processing.text_preprocessor import VietnameseTextPreprocessor
 from src.processing.sentiment_analyzer import SentimentAnalyzer
+from src.services.analysis_cache import analysis_cache
 from src.models.classifier import NewsClassifier
 import pandas as pd
 
@@ -62,14 +63,13 @@ def main():
             logger.info(f"  Text length: {len(full_text)} chars")
             
             # Preprocess
-            processed = preprocessor.preprocess_pipeline(full_text)
+            processed = analysis_cache.preprocess(preprocessor, full_text)
             
             # Analyze sentiment
-            sentiment = sentiment_analyzer.analyze(full_text)
+            sentiment = analysis_cache.sentiment(sentiment_analyzer, full_text)
             
             logger.info(f"  Sentiment: {sentiment['label']} | Sectors: {processed['sectors']}")
             
-            # OLD CODE (Thiếu predicted_sentiment)
             processed_data.append({
                 'source': row['source'],
                 'title': row['title'],
@@ -82,8 +82,7 @@ def main():
                 'sentiment_negative': sentiment['negative'],
                 'sentiment_neutral': sentiment['neutral'],
                 'predicted_label': sentiment['label'],
-                'predicted_sentiment': ['Tiêu cực', 'Trung tính', 'Tích cực'][sentiment['label']],  # ← CÓ DÒNG NÀY
-                'sectors': ','.join(processed['sectors']),
+                'sectors': processed['sectors'],
                 'processed_at': datetime.now()
             })
             
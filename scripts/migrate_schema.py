@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script chuyển processed_articles sang schema v2 (xem src/database/schema.py)
+
+- sectors: chuỗi phân tách bằng dấu phẩy -> mảng mã ngành, thêm sector
+- predicted_sentiment (chuỗi) -> predicted_label
+- content -> collection article_contents, document giữ summary và content_length
+
+Document trùng article_key với một document khác (cùng một bài viết) không
+chuyển được vì index unique; script liệt kê _id của chúng, chạy với
+--delete-duplicates để xóa (giữ lại document đã có article_key).
+"""
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import argparse
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from src.database.db_manager import DatabaseManager
+from src.database.schema import SCHEMA_VERSION, CONTENT_COLLECTION, encode_processed
+from src.utils.helpers import make_article_key
+
+# Mã lỗi MongoDB khi vi phạm index unique
+DUPLICATE_KEY_ERROR = 11000
+
+def migration_update(doc):
+    """Update ($set/$unset) chuyển một document sang schema v2, kèm content_document hoặc None"""
+    if not doc.get('article_key'):
+        doc['article_key'] = make_article_key(doc)
+
+    encoded, content = encode_processed(doc)
+    encoded.pop('_id', None)
+    update = {'$set': encoded}
+    removed = [field for field in ('predicted_sentiment', 'content') if field in doc]
+    if removed:
+        update['$unset'] = {field: '' for field in removed}
+    return update, content
+
+def migrate(batch_size=500, dry_run=False, delete_duplicates=False):
+    """Chuyển các document chưa có schema_version hiện tại, trả về số document đã chuyển"""
+    db_manager = DatabaseManager()
+    collection = db_manager.config.get_collection('processed_articles')
+
+    if collection is None:
+        print("❌ Không thể kết nối database!")
+        return 0
+
+    query = {'schema_version': {'$ne': SCHEMA_VERSION}}
+    total = collection.count_documents(query)
+    print(f"📊 {total:,} documents cần chuyển sang schema v{SCHEMA_VERSION}")
+    if total == 0 or dry_run:
+        return 0
+
+    migrated = 0
+    failed_ids = []
+    # (_id, article_key) của các document trùng article_key
+    duplicates = []
+    # Document đã chuyển không còn khớp query, nên luôn đọc lại batch đầu tiên
+    while True:
+        batch_query = dict(query, _id={'$nin': failed_ids}) if failed_ids else query
+        docs = list(collection.find(batch_query).limit(batch_size))
+        if not docs:
+            break
+
+        operations = []
+        content_docs = []
+        for doc in docs:
+            update, content = migration_update(doc)
+            operations.append(UpdateOne({'_id': doc['_id']}, update))
+
+            if content:
+                content_docs.append(content)
+
+        # Ghi content trước để không mất dữ liệu nếu bước sau lỗi
+        if content_docs:
+            db_manager.bulk_upsert(CONTENT_COLLECTION, content_docs)
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+        except BulkWriteError as e:
+            # Thường là trùng article_key với document khác, bỏ qua các document lỗi
+            migrated += e.details.get('nModified', 0)
+            for error in e.details.get('writeErrors', []):
+                doc = docs[error['index']]
+                failed_ids.append(doc['_id'])
+                if error.get('code') == DUPLICATE_KEY_ERROR:
+                    duplicates.append((doc['_id'], doc.get('article_key')))
+                else:
+                    print(f"⚠️  Bỏ qua document {doc['_id']}: {error.get('errmsg')}")
+
+        print(f"  Đã chuyển {migrated:,}/{total:,}...")
+
+    print(f"\n✅ Đã chuyển {migrated:,} documents")
+    if failed_ids:
+        print(f"⚠️  Lỗi: {len(failed_ids):,} documents")
+    if duplicates:
+        report_duplicates(collection, duplicates, delete_duplicates)
+    return migrated
+
+def report_duplicates(collection, duplicates, delete=False):
+    """Liệt kê (hoặc xóa) các document trùng article_key với document khác"""
+    print(f"⚠️  {len(duplicates):,} documents trùng article_key với document khác, vẫn ở schema cũ:")
+    for doc_id, article_key in duplicates:
+        print(f"    _id={doc_id} article_key={article_key}")
+
+    if not delete:
+        print("    Chạy lại với --delete-duplicates để xóa các document này (giữ document đã có article_key)")
+        return
+    result = collection.delete_many({'_id': {'$in': [doc_id for doc_id, _ in duplicates]}})
+    print(f"🗑️  Đã xóa {result.deleted_count:,} documents trùng")
+
+def main():
+    parser = argparse.ArgumentParser(description='Chuyển processed_articles sang schema mới')
+    parser.add_argument('--batch-size', type=int, default=500, help='Số document mỗi lần bulk_write')
+    parser.add_argument('--dry-run', action='store_true', help='Chỉ đếm số document cần chuyển')
+    parser.add_argument('--delete-duplicates', action='store_true',
+                        help='Xóa document trùng article_key với document khác thay vì chỉ liệt kê')
+
+    args = parser.parse_args()
+    migrate(batch_size=args.batch_size, dry_run=args.dry_run, delete_duplicates=args.delete_duplicates)
+
+if __name__ == "__main__":
+    main()
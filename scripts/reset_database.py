@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.database import MongoDBConfig
 from src.services.cache_service import dashboard_cache
+from src.database.indexes import ensure_indexes, explain_dashboard_queries
 import argparse
 
 def clear_specific_collections(collection_names):
@@ -52,8 +53,29 @@ def drop_collections(collection_names):
         else:
             print(f"⚠️  Collection '{col_name}' không tồn tại")
     
+    # Tạo lại index cho các collection vừa drop
+    rebuild_indexes()
     return True
 
+def rebuild_indexes():
+    """Tạo các index cần thiết (idempotent)"""
+    config = MongoDBConfig()
+    db = config.get_database()
+    
+    if db is None:
+        print("❌ Không thể kết nối database!")
+        return False
+    
+    result = ensure_indexes(db)
+    for col_name, index_names in result.items():
+        print(f"📇 {col_name}: {', '.join(index_names) if index_names else '(không có)'}")
+    return True
+
+def explain_queries():
+    """In execution plan của các query dashboard"""
+    config = MongoDBConfig()
+    explain_dashboard_queries(config.get_database())
+
 def show_database_info():
     """Hiển thị thông tin database"""
     config = MongoDBConfig()
@@ -82,6 +104,8 @@ def main():
     parser.add_argument('--drop', nargs='*', help='Xóa hoàn toàn collections')
     parser.add_argument('--all', action='store_true', help='Xóa toàn bộ dữ liệu')
     parser.add_argument('--cache', action='store_true', help='Chỉ xóa cache dashboard')
+    parser.add_argument('--indexes', action='store_true', help='Tạo các index cần thiết')
+    parser.add_argument('--explain', action='store_true', help='In execution plan của các query dashboard')
     
     args = parser.parse_args()
     
@@ -107,6 +131,10 @@ def main():
     elif args.cache:
         dashboard_cache.clear()
         print("✅ Đã xóa cache dashboard")
+    elif args.indexes:
+        rebuild_indexes()
+    elif args.explain:
+        explain_queries()
     else:
         parser.print_help()
 
@@ -19,22 +19,29 @@ def main():
     
     logger.info("🚀 Bắt đầu huấn luyện model...")
     
-    # Load dữ liệu
+    # Load dữ liệu theo batch, chỉ lấy 2 cột cần cho huấn luyện
     db_manager = DatabaseManager()
-    df = db_manager.load_processed_data(limit=5000)
+    train_chunks = []
+    has_columns = False
     
-    if df.empty:
-        logger.error("❌ Không có dữ liệu để huấn luyện!")
-        return
+    for chunk in db_manager.iter_processed(
+        batch_size=1000,
+        projection=['cleaned_text', 'predicted_label'],
+        limit=5000
+    ):
+        if 'cleaned_text' not in chunk.columns or 'predicted_label' not in chunk.columns:
+            continue
+        has_columns = True
+        
+        chunk = chunk[['cleaned_text', 'predicted_label']].dropna()
+        chunk.columns = ['text', 'label']
+        train_chunks.append(chunk[chunk['text'].str.len() > 10])
     
-    # Chuẩn bị dữ liệu
-    if 'cleaned_text' not in df.columns or 'predicted_label' not in df.columns:
-        logger.error("❌ Dữ liệu thiếu cột cần thiết!")
+    if not has_columns:
+        logger.error("❌ Không có dữ liệu để huấn luyện hoặc dữ liệu thiếu cột cần thiết!")
         return
     
-    df_train = df[['cleaned_text', 'predicted_label']].copy()
-    df_train.columns = ['text', 'label']
-    df_train = df_train[df_train['text'].str.len() > 10]
+    df_train = pd.concat(train_chunks, ignore_index=True)
     
     if len(df_train) < 100:
         logger.warning("⚠️ Dữ liệu quá ít để huấn luyện!")
@@ -16,6 +16,7 @@ import json
 import logging
 from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
+from src.utils.helpers import utc_now
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -51,7 +52,7 @@ class NewsSpider(scrapy.Spider):
                         'title': title,
                         'summary': summary,
                         'link': link,
-                        'crawl_time': datetime.now()
+                        'crawl_time': utc_now()
                     })
 
 class FinancialNewsCrawler:
@@ -212,7 +213,7 @@ class FinancialNewsCrawler:
                                 'title': title,
                                 'summary': summary,
                                 'link': link,
-                                'crawl_time': datetime.now()
+                                'crawl_time': utc_now()
                             })
                     except:
                         continue
@@ -248,7 +249,7 @@ class FinancialNewsCrawler:
                             'summary': article.text[:300] + '...' if len(article.text) > 300 else article.text,
                             'content': article.text,  # THÊM: Lưu full content
                             'link': article_url,
-                            'crawl_time': datetime.now(),
+                            'crawl_time': utc_now(),
                             'publish_date': article.publish_date if article.publish_date else datetime.now()
                         })
                         
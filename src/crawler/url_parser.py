@@ -25,11 +25,23 @@ class URLParser:
         except:
             return False
     
-    def extract_with_newspaper(self, url):
-        """Trích xuất nội dung bằng Newspaper3k - CẢI THIỆN"""
+    def fetch(self, url):
+        """GET trang bài viết, trả về (html, validators ETag/Last-Modified của response)"""
+        response = requests.get(url, headers=self.headers, timeout=10)
+        response.raise_for_status()
+        # Giống newspaper: không có charset thì requests đoán ISO-8859-1, để parser tự nhận encoding
+        html = response.content if response.encoding == 'ISO-8859-1' else response.text
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        return html, validators
+    
+    def extract_with_newspaper(self, url, html=None):
+        """Trích xuất nội dung bằng Newspaper3k - CẢI THIỆN (html: trang đã tải sẵn)"""
         try:
             article = Article(url, language='vi')
-            article.download()
+            article.download(input_html=html)
             article.parse()
             
             # Kiểm tra content có đầy đủ không
@@ -52,13 +64,15 @@ class URLParser:
             logger.error(f"Newspaper extraction failed: {e}")
             return {'success': False, 'error': str(e)}
     
-    def extract_with_beautifulsoup(self, url):
-        """Trích xuất nội dung bằng BeautifulSoup (fallback) - CẢI THIỆN"""
+    def extract_with_beautifulsoup(self, url, html=None):
+        """Trích xuất nội dung bằng BeautifulSoup (fallback) - CẢI THIỆN (html: trang đã tải sẵn)"""
         try:
-            response = requests.get(url, headers=self.headers, timeout=10)
-            response.raise_for_status()
+            if html is None:
+                response = requests.get(url, headers=self.headers, timeout=10)
+                response.raise_for_status()
+                html = response.content
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = BeautifulSoup(html, 'html.parser')
             
             # Tìm tiêu đề
             title = None
@@ -109,18 +123,54 @@ class URLParser:
             logger.error(f"BeautifulSoup extraction failed: {e}")
             return {'success': False, 'error': str(e)}
     
+    def is_modified(self, url, etag=None, last_modified=None):
+        """
+        Conditional GET với If-None-Match/If-Modified-Since
+        
+        Returns: False nếu server trả 304, True nếu bài đã đổi, None nếu không xác định được
+        """
+        if not etag and not last_modified:
+            return None
+        
+        headers = dict(self.headers)
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response = requests.get(url, headers=headers, timeout=5, stream=True)
+            response.close()
+            return response.status_code != 304
+        except Exception as e:
+            logger.debug(f"Conditional request failed for {url}: {e}")
+            return None
+    
     def parse_url(self, url):
-        """Parse URL và trích xuất nội dung"""
+        """
+        Parse URL và trích xuất nội dung
+
+        Trang chỉ tải một lần cho cả hai cách trích xuất; kết quả có thêm
+        validators (ETag/Last-Modified của chính response đó) cho is_modified.
+        """
         if not self.validate_url(url):
             return {'success': False, 'error': 'URL không hợp lệ'}
         
+        try:
+            html, validators = self.fetch(url)
+        except Exception as e:
+            # Để newspaper/BeautifulSoup tự tải lại (và báo lỗi) như trước
+            logger.debug(f"Fetch failed for {url}: {e}")
+            html, validators = None, {'etag': None, 'last_modified': None}
+        
         # Thử Newspaper3k trước
-        result = self.extract_with_newspaper(url)
+        result = self.extract_with_newspaper(url, html)
         
         # Nếu thất bại hoặc content quá ngắn, thử BeautifulSoup
         if not result['success']:
             logger.info("Trying BeautifulSoup fallback...")
-            result = self.extract_with_beautifulsoup(url)
+            result = self.extract_with_beautifulsoup(url, html)
+        
+        result['validators'] = validators
         
         # Log kết quả
         if result['success']:
@@ -2,9 +2,12 @@
 Dashboard chính sử dụng Dash
 """
 import dash
+from flask import jsonify
 from dash import html, dcc
 import dash_bootstrap_components as dbc
-from config.settings import DASHBOARD_CONFIG
+from config.settings import DASHBOARD_CONFIG, PERFORMANCE_CONFIG
+from src.services.cache_service import memory_report
+from src.services.warmup import warmup
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,6 +23,18 @@ app = dash.Dash(
 # Server cho production
 server = app.server
 
+@server.route('/readyz')
+def readyz():
+    """Readiness cho load balancer: 200 khi worker đã nạp xong dữ liệu, 503 nếu chưa"""
+    status = warmup.status()
+    return jsonify(status), 200 if status['ready'] else 503
+
+if PERFORMANCE_CONFIG['cache_debug_view']:
+    @server.route('/debug/cache')
+    def debug_cache():
+        """Kích thước các cache/frame trong process này và các entry lớn nhất"""
+        return jsonify(memory_report())
+
 def run_dashboard():
     """Chạy dashboard"""
     logger.info(f"Starting dashboard on {DASHBOARD_CONFIG['host']}:{DASHBOARD_CONFIG['port']}")
@@ -2,13 +2,13 @@
 import threading
 from dash import html, dcc, Input, Output, State
 import dash_bootstrap_components as dbc
-import pandas as pd
 import logging
 logger = logging.getLogger(__name__)
 from src.crawler.news_crawler import FinancialNewsCrawler
-from src.database.db_manager import DatabaseManager
+from src.database.write_queue import write_queue
 from src.processing.text_preprocessor import VietnameseTextPreprocessor
 from src.processing.sentiment_analyzer import SentimentAnalyzer
+from src.services.analysis_cache import analysis_cache
 
 # Global state
 crawl_state = {
@@ -101,7 +101,6 @@ def run_crawler_background(sources, max_workers):
     """Chạy crawler trong background thread"""
     try:
         crawler = FinancialNewsCrawler()
-        db_manager = DatabaseManager()
         preprocessor = VietnameseTextPreprocessor()
         sentiment_analyzer = SentimentAnalyzer()
         
@@ -130,8 +129,8 @@ def run_crawler_background(sources, max_workers):
                 for article in articles:
                     try:
                         full_text = f"{article['title']} {article.get('summary', '')}"
-                        processed = preprocessor.preprocess_pipeline(full_text)
-                        sentiment = sentiment_analyzer.analyze(full_text)
+                        processed = analysis_cache.preprocess(preprocessor, full_text)
+                        sentiment = analysis_cache.sentiment(sentiment_analyzer, full_text)
                         
                         article.update({
                             'cleaned_text': processed['cleaned_text'],
@@ -139,7 +138,7 @@ def run_crawler_background(sources, max_workers):
                             'sentiment_negative': sentiment['negative'],
                             'sentiment_neutral': sentiment['neutral'],
                             'predicted_label': sentiment['label'],
-                            'sectors': ','.join(processed['sectors'])
+                            'sectors': processed['sectors']
                         })
                         
                         crawl_state['processed'] += 1
@@ -149,10 +148,9 @@ def run_crawler_background(sources, max_workers):
                         crawl_state['errors'] += 1
                         logger.error(f"Error processing article: {e}")
                 
-                # Lưu vào database
+                # Lưu vào database qua write-behind queue, không chờ ghi xong
                 if articles:
-                    df = pd.DataFrame(articles)
-                    db_manager.save_processed_data(df)
+                    write_queue.enqueue_many('processed_articles', articles)
                 
             except Exception as e:
                 crawl_state['errors'] += 1
@@ -1,23 +1,31 @@
 """
 Enhanced Callbacks cho Dashboard với tất cả tính năng mới
 """
-from dash import Output, Input, State, html, callback_context
+from dash import Output, Input, State, html, callback_context, no_update
 import dash_bootstrap_components as dbc
 from dash.exceptions import PreventUpdate
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import logging
 import numpy as np
 
+from config.database import MongoDBConfig
 from src.database.db_manager import DatabaseManager
-from src.utils.performance import cache_result, optimize_dataframe, dashboard_cache
-from config.settings import SECTOR_MAPPINGS, PERFORMANCE_CONFIG
+from src.database.write_queue import write_queue
+from src.services.dashboard_aggregates import DashboardAggregates
+from src.services.incremental_loader import IncrementalProcessedFrame
+from src.services.url_memo import URLAnalysisMemo
+from src.services.figure_cache import figure_key, get_figure
+from src.services.timeline import bucket_for_days, count_timeline, window_start
+from src.services.cache_service import register_memory_report
+from src.utils.logging_utils import lazy
+from src.utils.helpers import utc_now
 from src.crawler.url_parser import URLParser
 from src.processing.text_preprocessor import VietnameseTextPreprocessor
 from src.processing.sentiment_analyzer import SentimentAnalyzer
-from config.settings import SENTIMENT_COLORS, SENTIMENT_LABELS
+from config.settings import SENTIMENT_COLORS, SENTIMENT_LABELS, WARMUP_CONFIG
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +34,44 @@ db_manager = DatabaseManager()
 url_parser = URLParser()
 preprocessor = VietnameseTextPreprocessor()
 sentiment_analyzer = SentimentAnalyzer()
+aggregates = DashboardAggregates(db_manager)
+processed_frame = IncrementalProcessedFrame(db_manager)
+register_memory_report('processed_frame', processed_frame.memory_report)
+register_memory_report('write_queue', write_queue.get_metrics)
+register_memory_report('mongo_pool', MongoDBConfig.get_pool_stats)
+url_memo = URLAnalysisMemo(db_manager, url_parser, preprocessor, sentiment_analyzer)
+# Token dữ liệu lần gần nhất process này thấy (xem current_data_version)
+_seen_data_version = None
+
+# Các cột get_filtered_data luôn trả về (dùng để lọc và vẽ biểu đồ)
+BASE_FIELDS = ('crawl_time', 'crawl_day', 'processed_at', 'sectors', 'predicted_label', 'predicted_sentiment')
+
+# Timeline: tiêu đề trục và định dạng thời gian khi hover theo bucket
+TIMELINE_AXIS_TITLES = {'H': 'Giờ', 'D': 'Ngày', 'W': 'Tuần'}
+TIMELINE_HOVER_FORMATS = {
+    'H': 'Giờ: %{x|%H:00 %d/%m/%Y}',
+    'D': 'Ngày: %{x|%d/%m/%Y}',
+    'W': 'Tuần từ: %{x|%d/%m/%Y}'
+}
+
+# Cột bổ sung cho từng loại hiển thị
+WORD_CLOUD_FIELDS = ('cleaned_text',)
+NEWS_TABLE_FIELDS = ('title', 'summary', 'source', 'link', 'sentiment_positive')
 
 def register_enhanced_callbacks(app):
     """Đăng ký tất cả callbacks nâng cao"""
+
+    # Token dữ liệu: chỉ đổi khi dữ liệu thay đổi hoặc cửa sổ thời gian trượt sang giờ mới,
+    # các callback bên dưới phụ thuộc vào token này
+    @app.callback(
+        Output('data-version', 'data'),
+        Input('interval-component', 'n_intervals'),
+        State('data-version', 'data')
+    )
+    def poll_data_version(n, current):
+        """Kiểm tra dữ liệu mỗi lần interval, no_update nếu không có gì thay đổi"""
+        token = current_data_version()
+        return no_update if token == current else token
     
     # Stats với filters
     @app.callback(
@@ -37,278 +80,282 @@ def register_enhanced_callbacks(app):
          Output('neutral-count', 'children'),
          Output('negative-count', 'children'),
          Output('market-sentiment-index', 'children')],
-        [Input('interval-component', 'n_intervals'),
+        [Input('data-version', 'data'),
          Input('sector-filter', 'value'),
          Input('time-filter', 'value'),
          Input('sentiment-filter', 'value')]
     )
-    def update_stats_with_filters(n, sector, days, sentiment_type):
+    def update_stats_with_filters(data_version, sector, days, sentiment_type):
         """Cập nhật thống kê với filters"""
-        df = get_filtered_data(sector, days, sentiment_type)
+        stats = aggregates.summarize(sector, days, sentiment_type)
         
-        if df.empty:
+        if stats['total'] == 0:
             return "0", "0", "0", "0", "+0.00"
         
-        total = len(df)
-        positive = len(df[df['predicted_label'] == 2]) if 'predicted_label' in df.columns else 0
-        neutral = len(df[df['predicted_label'] == 1]) if 'predicted_label' in df.columns else 0
-        negative = len(df[df['predicted_label'] == 0]) if 'predicted_label' in df.columns else 0
+        by_label = stats['by_label']
         
         # Market Sentiment Index
-        if 'predicted_label' in df.columns:
-            sentiment_scores = df['predicted_label'].map({0: -1, 1: 0, 2: 1})
-            avg_score = sentiment_scores.mean()
-            market_index = f"{avg_score:+.2f}"
-        else:
-            market_index = "+0.00"
+        market_index = f"{stats['market_index']:+.2f}"
         
-        return str(total), str(positive), str(neutral), str(negative), market_index
+        return str(stats['total']), str(by_label[2]), str(by_label[1]), str(by_label[0]), market_index
     
     # Gauge Chart cho Market Sentiment
     @app.callback(
-        Output('sentiment-gauge-chart', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sentiment-gauge-chart', 'figure'),
+         Output('sentiment-gauge-chart-rendered', 'data')],
+        [Input('data-version', 'data'),
          Input('sector-filter', 'value'),
          Input('time-filter', 'value'),
-         Input('sentiment-filter', 'value')]
+         Input('sentiment-filter', 'value')],
+        State('sentiment-gauge-chart-rendered', 'data')
     )
-    def update_gauge_chart(n, sector, days, sentiment_type):
+    def update_gauge_chart(data_version, sector, days, sentiment_type, rendered):
         """Biểu đồ gauge cho sentiment tổng quan"""
-        df = get_filtered_data(sector, days, sentiment_type)
-        
-        if df.empty or 'predicted_label' not in df.columns:
-            return go.Figure()
-        
-        # Tính tỷ lệ tích cực
-        sentiment_counts = df['predicted_label'].value_counts(normalize=True)
-        positive_ratio = sentiment_counts.get(2, 0) * 100
-        
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = positive_ratio,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': "Tỷ lệ tin tích cực (%)"},
-            delta = {'reference': 50},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "#2ecc71"},
-                'steps': [
-                    {'range': [0, 25], 'color': "#ffebee"},
-                    {'range': [25, 50], 'color': "#fff3e0"},
-                    {'range': [50, 75], 'color': "#e8f5e8"},
-                    {'range': [75, 100], 'color': "#c8e6c9"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90
+        def build():
+            stats = aggregates.summarize(sector, days, sentiment_type)
+            labelled = sum(stats['by_label'].values())
+            
+            if labelled == 0:
+                return go.Figure()
+            
+            # Tính tỷ lệ tích cực
+            positive_ratio = stats['by_label'][2] / labelled * 100
+            
+            fig = go.Figure(go.Indicator(
+                mode = "gauge+number+delta",
+                value = positive_ratio,
+                domain = {'x': [0, 1], 'y': [0, 1]},
+                title = {'text': "Tỷ lệ tin tích cực (%)"},
+                delta = {'reference': 50},
+                gauge = {
+                    'axis': {'range': [None, 100]},
+                    'bar': {'color': "#2ecc71"},
+                    'steps': [
+                        {'range': [0, 25], 'color': "#ffebee"},
+                        {'range': [25, 50], 'color': "#fff3e0"},
+                        {'range': [50, 75], 'color': "#e8f5e8"},
+                        {'range': [75, 100], 'color': "#c8e6c9"}
+                    ],
+                    'threshold': {
+                        'line': {'color': "red", 'width': 4},
+                        'thickness': 0.75,
+                        'value': 90
+                    }
                 }
-            }
-        ))
+            ))
+            
+            fig.update_layout(height=300)
+            return fig
         
-        fig.update_layout(height=300)
-        return fig
+        return render_figure('sentiment-gauge-chart', (sector, days, sentiment_type), aggregates.version(days), build, rendered)
     
     # Sentiment Pie Chart
     @app.callback(
-        Output('sentiment-pie-chart', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sentiment-pie-chart', 'figure'),
+         Output('sentiment-pie-chart-rendered', 'data')],
+        [Input('data-version', 'data'),
          Input('sector-filter', 'value'),
-         Input('time-filter', 'value')]
+         Input('time-filter', 'value')],
+        State('sentiment-pie-chart-rendered', 'data')
     )
-    def update_sentiment_pie(n, sector, days):
+    def update_sentiment_pie(data_version, sector, days, rendered):
         """Biểu đồ tròn phân bố sentiment"""
-        df = get_filtered_data(sector, days, 'all')
-        
-        if df.empty or 'predicted_sentiment' not in df.columns:
-            return go.Figure()
-        
-        sentiment_counts = df['predicted_sentiment'].value_counts()
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=sentiment_counts.index,
-            values=sentiment_counts.values,
-            marker=dict(colors=[SENTIMENT_COLORS.get(s, '#95a5a6') for s in sentiment_counts.index]),
-            hole=0.4,
-            textinfo='label+percent',
-            textposition='inside',
-            hovertemplate='<b>%{label}</b><br>Số lượng: %{value}<br>Tỷ lệ: %{percent}<extra></extra>'
-        )])
-        
-        fig.update_layout(
-            showlegend=False,
-            height=350,
-            margin=dict(l=10, r=10, t=30, b=10)
-        )
+        def build():
+            stats = aggregates.summarize(sector, days, 'all')
+            
+            if stats['total'] == 0:
+                return go.Figure()
+            
+            sentiment_counts = pd.Series(stats['by_sentiment']).sort_values(ascending=False)
+            
+            fig = go.Figure(data=[go.Pie(
+                labels=sentiment_counts.index,
+                values=sentiment_counts.values,
+                marker=dict(colors=[SENTIMENT_COLORS.get(s, '#95a5a6') for s in sentiment_counts.index]),
+                hole=0.4,
+                textinfo='label+percent',
+                textposition='inside',
+                hovertemplate='<b>%{label}</b><br>Số lượng: %{value}<br>Tỷ lệ: %{percent}<extra></extra>'
+            )])
+            
+            fig.update_layout(
+                showlegend=False,
+                height=350,
+                margin=dict(l=10, r=10, t=30, b=10)
+            )
+            
+            return fig
         
-        return fig
+        return render_figure('sentiment-pie-chart', (sector, days), aggregates.version(days), build, rendered)
     
     # Sector Pie Chart
     @app.callback(
-        Output('sector-pie-chart', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sector-pie-chart', 'figure'),
+         Output('sector-pie-chart-rendered', 'data')],
+        [Input('data-version', 'data'),
          Input('time-filter', 'value'),
-         Input('sentiment-filter', 'value')]
+         Input('sentiment-filter', 'value')],
+        State('sector-pie-chart-rendered', 'data')
     )
-    def update_sector_pie(n, days, sentiment_type):
+    def update_sector_pie(data_version, days, sentiment_type, rendered):
         """Biểu đồ tròn phân bố theo ngành"""
-        df = get_filtered_data('all', days, sentiment_type)
-        
-        if df.empty or 'sectors' not in df.columns:
-            return go.Figure()
-        
-        sector_counts = df['sectors'].value_counts()
-        
-        # Màu sắc cho các ngành
-        sector_colors = {
-            'Banking': '#3498db',
-            'Energy': '#f39c12',
-            'Real Estate': '#e74c3c',
-            'Technology': '#9b59b6',
-            'Manufacturing': '#1abc9c',
-            'Transportation': '#34495e',
-            'Agriculture': '#27ae60',
-            'Retail': '#e67e22',
-            'Finance': '#2ecc71',
-            'Other': '#95a5a6'
-        }
-        
-        fig = go.Figure(data=[go.Pie(
-            labels=sector_counts.index,
-            values=sector_counts.values,
-            marker=dict(colors=[sector_colors.get(s, '#95a5a6') for s in sector_counts.index]),
-            hole=0.4,
-            textinfo='percent',
-            textposition='inside',
-            hovertemplate='<b>%{label}</b><br>Số bài viết: %{value}<br>Tỷ lệ: %{percent}<extra></extra>'
-        )])
-        
-        fig.update_layout(
-            showlegend=True,
-            height=350,
-            margin=dict(l=10, r=10, t=30, b=10),
-            legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05, font=dict(size=10))
-        )
+        def build():
+            stats = aggregates.summarize('all', days, sentiment_type)
+            
+            if stats['total'] == 0:
+                return go.Figure()
+            
+            sector_counts = pd.Series(
+                {name: values['count'] for name, values in stats['by_sector'].items()}
+            ).sort_values(ascending=False)
+            
+            # Màu sắc cho các ngành
+            sector_colors = {
+                'Banking': '#3498db',
+                'Energy': '#f39c12',
+                'Real Estate': '#e74c3c',
+                'Technology': '#9b59b6',
+                'Manufacturing': '#1abc9c',
+                'Transportation': '#34495e',
+                'Agriculture': '#27ae60',
+                'Retail': '#e67e22',
+                'Finance': '#2ecc71',
+                'Other': '#95a5a6'
+            }
+            
+            fig = go.Figure(data=[go.Pie(
+                labels=sector_counts.index,
+                values=sector_counts.values,
+                marker=dict(colors=[sector_colors.get(s, '#95a5a6') for s in sector_counts.index]),
+                hole=0.4,
+                textinfo='percent',
+                textposition='inside',
+                hovertemplate='<b>%{label}</b><br>Số bài viết: %{value}<br>Tỷ lệ: %{percent}<extra></extra>'
+            )])
+            
+            fig.update_layout(
+                showlegend=True,
+                height=350,
+                margin=dict(l=10, r=10, t=30, b=10),
+                legend=dict(orientation="v", yanchor="middle", y=0.5, xanchor="left", x=1.05, font=dict(size=10))
+            )
+            
+            return fig
         
-        return fig
+        return render_figure('sector-pie-chart', (days, sentiment_type), aggregates.version(days), build, rendered)
     
     # Heatmap theo ngành
     @app.callback(
-        Output('sector-heatmap', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sector-heatmap', 'figure'),
+         Output('sector-heatmap-rendered', 'data')],
+        [Input('data-version', 'data'),
          Input('time-filter', 'value'),
-         Input('sentiment-filter', 'value')]
+         Input('sentiment-filter', 'value')],
+        State('sector-heatmap-rendered', 'data')
     )
-    def update_heatmap(n, days, sentiment_type):
+    def update_heatmap(data_version, days, sentiment_type, rendered):
         """Bản đồ nhiệt theo ngành"""
-        df = get_filtered_data('all', days, sentiment_type)
-        
-        if df.empty or 'predicted_label' not in df.columns:
-            return go.Figure()
-        
-        # Các ngành chính
-        sectors = ['Banking', 'Energy', 'Real Estate', 'Technology', 'Manufacturing', 'Other']
-        sentiment_matrix = []
-        
-        for sector in sectors:
-            if 'sectors' in df.columns:
-                sector_data = df[df['sectors'].str.contains(sector, na=False)]
-            else:
-                sector_data = df
-                
-            if not sector_data.empty:
-                sentiment_scores = sector_data['predicted_label'].map({0: -1, 1: 0, 2: 1})
-                avg_score = sentiment_scores.mean()
-            else:
-                avg_score = 0
-            sentiment_matrix.append([avg_score])
-        
-        fig = go.Figure(data=go.Heatmap(
-            z=sentiment_matrix,
-            y=sectors,
-            x=['Sentiment Score'],
-            colorscale='RdYlGn',
-            zmid=0,
-            colorbar=dict(title="Sentiment Score"),
-            text=[[f"{score[0]:.2f}"] for score in sentiment_matrix],
-            texttemplate="%{text}",
-            textfont={"size": 12}
-        ))
-        
-        fig.update_layout(
-            height=300,
-            xaxis_title='',
-            yaxis_title='',
-            margin=dict(l=100, r=50, t=20, b=20)
-        )
+        def build():
+            stats = aggregates.summarize('all', days, sentiment_type)
+            
+            if stats['total'] == 0:
+                return go.Figure()
+            
+            # Các ngành chính
+            sectors = ['Banking', 'Energy', 'Real Estate', 'Technology', 'Manufacturing', 'Other']
+            sentiment_matrix = [
+                [stats['by_sector'].get(sector, {}).get('score', 0)]
+                for sector in sectors
+            ]
+            
+            fig = go.Figure(data=go.Heatmap(
+                z=sentiment_matrix,
+                y=sectors,
+                x=['Sentiment Score'],
+                colorscale='RdYlGn',
+                zmid=0,
+                colorbar=dict(title="Sentiment Score"),
+                text=[[f"{score[0]:.2f}"] for score in sentiment_matrix],
+                texttemplate="%{text}",
+                textfont={"size": 12}
+            ))
+            
+            fig.update_layout(
+                height=300,
+                xaxis_title='',
+                yaxis_title='',
+                margin=dict(l=100, r=50, t=20, b=20)
+            )
+            
+            return fig
         
-        return fig
+        return render_figure('sector-heatmap', (days, sentiment_type), aggregates.version(days), build, rendered)
     
     # Enhanced Sector Bar Chart
     @app.callback(
-        Output('sector-bar-chart', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sector-bar-chart', 'figure'),
+         Output('sector-bar-chart-rendered', 'data')],
+        [Input('data-version', 'data'),
          Input('sector-filter', 'value'),
          Input('time-filter', 'value'),
-         Input('sentiment-filter', 'value')]
+         Input('sentiment-filter', 'value')],
+        State('sector-bar-chart-rendered', 'data')
     )
-    def update_sector_chart(n, sector, days, sentiment_type):
+    def update_sector_chart(data_version, sector, days, sentiment_type, rendered):
         """Biểu đồ cột theo ngành với điểm sentiment"""
-        df = get_filtered_data('all', days, sentiment_type)
-        
-        if df.empty or 'predicted_label' not in df.columns:
-            return go.Figure()
-        
-        # Ensure sectors column
-        if 'sectors' not in df.columns:
-            df['sectors'] = 'Other'
-        
-        # Calculate average sentiment score by sector
-        df['sentiment_score'] = df['predicted_label'].map({0: -1, 1: 0, 2: 1})
-        sector_stats = df.groupby('sectors').agg({
-            'sentiment_score': 'mean',
-            'predicted_label': 'count'
-        }).reset_index()
-        
-        sector_stats = sector_stats.sort_values('sentiment_score', ascending=False)
-        
-        # Color based on sentiment
-        colors = [SENTIMENT_COLORS['Tích cực'] if score > 0.1 else 
-                 SENTIMENT_COLORS['Tiêu cực'] if score < -0.1 else 
-                 SENTIMENT_COLORS['Trung tính'] for score in sector_stats['sentiment_score']]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            x=sector_stats['sectors'],
-            y=sector_stats['sentiment_score'],
-            marker_color=colors,
-            text=[f'{score:.2f}<br>({count} bài)' for score, count in 
-                  zip(sector_stats['sentiment_score'], sector_stats['predicted_label'])],
-            textposition='auto',
-            hovertemplate='<b>%{x}</b><br>Sentiment: %{y:.2f}<br>Số bài: %{customdata}<extra></extra>',
-            customdata=sector_stats['predicted_label']
-        ))
-        
-        fig.update_layout(
-            xaxis_title='Ngành',
-            yaxis_title='Điểm Sentiment Trung bình',
-            yaxis=dict(range=[-1, 1]),
-            hovermode='x unified'
-        )
+        def build():
+            stats = aggregates.summarize('all', days, sentiment_type)
+            
+            if stats['total'] == 0:
+                return go.Figure()
+            
+            # Average sentiment score by sector
+            sector_stats = pd.DataFrame([
+                {'sectors': name, 'sentiment_score': values['score'], 'predicted_label': values['count']}
+                for name, values in stats['by_sector'].items()
+            ])
+            
+            sector_stats = sector_stats.sort_values('sentiment_score', ascending=False)
+            
+            # Color based on sentiment
+            colors = [SENTIMENT_COLORS['Tích cực'] if score > 0.1 else 
+                     SENTIMENT_COLORS['Tiêu cực'] if score < -0.1 else 
+                     SENTIMENT_COLORS['Trung tính'] for score in sector_stats['sentiment_score']]
+            
+            fig = go.Figure()
+            
+            fig.add_trace(go.Bar(
+                x=sector_stats['sectors'],
+                y=sector_stats['sentiment_score'],
+                marker_color=colors,
+                text=[f'{score:.2f}<br>({count} bài)' for score, count in 
+                      zip(sector_stats['sentiment_score'], sector_stats['predicted_label'])],
+                textposition='auto',
+                hovertemplate='<b>%{x}</b><br>Sentiment: %{y:.2f}<br>Số bài: %{customdata}<extra></extra>',
+                customdata=sector_stats['predicted_label']
+            ))
+            
+            fig.update_layout(
+                xaxis_title='Ngành',
+                yaxis_title='Điểm Sentiment Trung bình',
+                yaxis=dict(range=[-1, 1]),
+                hovermode='x unified'
+            )
+            
+            return fig
         
-        return fig
+        return render_figure('sector-bar-chart', (days, sentiment_type), aggregates.version(days), build, rendered)
     
     # Word Cloud Display
     @app.callback(
         Output('word-cloud-display', 'children'),
-        [Input('interval-component', 'n_intervals'),
+        [Input('data-version', 'data'),
          Input('sector-filter', 'value'),
          Input('time-filter', 'value')]
     )
-    def update_word_cloud(n, sector, days):
+    def update_word_cloud(data_version, sector, days):
         """Hiển thị từ khóa nổi bật"""
-        df = get_filtered_data(sector, days, 'all')
+        df = get_filtered_data(sector, days, 'all', fields=WORD_CLOUD_FIELDS)
         
         if df.empty or 'cleaned_text' not in df.columns:
             return html.P("Chưa có dữ liệu", className='text-muted text-center')
@@ -339,187 +386,106 @@ def register_enhanced_callbacks(app):
     
     # Enhanced Timeline
     @app.callback(
-        Output('sentiment-timeline', 'figure'),
-        [Input('interval-component', 'n_intervals'),
+        [Output('sentiment-timeline', 'figure'),
+         Output('sentiment-timeline-rendered', 'data')],
+        [Input('data-version', 'data'),
         Input('sector-filter', 'value'),
         Input('time-filter', 'value'),
-        Input('sentiment-filter', 'value')]
+        Input('sentiment-filter', 'value')],
+        State('sentiment-timeline-rendered', 'data')
     )
-    def update_timeline(n, sector, days, sentiment_type):
-        """Timeline với đầy đủ các ngày và hover chi tiết"""
-        df = get_filtered_data(sector, days, sentiment_type)
-        
-        if df.empty or 'crawl_time' not in df.columns:
-            return go.Figure()
-        
-        # Ensure crawl_time is datetime
-        df['crawl_time'] = pd.to_datetime(df['crawl_time'], errors='coerce')
-        df = df[df['crawl_time'].notna()]
-        df['date'] = df['crawl_time'].dt.date
-        
-        # ===== FIX: Xử lý predicted_sentiment NULL =====
-        if 'predicted_sentiment' not in df.columns or df['predicted_sentiment'].isna().all():
-            logger.warning("⚠️ predicted_sentiment column missing or all NULL, creating from predicted_label")
-            
-            if 'predicted_label' in df.columns:
-                df['predicted_sentiment'] = df['predicted_label'].map({
-                    0: 'Tiêu cực',
-                    1: 'Trung tính', 
-                    2: 'Tích cực'
-                })
-                logger.info(f"✅ Created predicted_sentiment for {len(df)} records")
-            else:
-                logger.error("❌ Neither predicted_sentiment nor predicted_label available!")
-                return go.Figure()
-        
-        # ===== FIX: Clean NaN values trong predicted_sentiment =====
-        # Convert NaN to proper sentiment based on predicted_label
-        mask_null = df['predicted_sentiment'].isna()
-        if mask_null.any():
-            logger.warning(f"⚠️ Found {mask_null.sum()} NULL predicted_sentiment, fixing...")
-            
-            if 'predicted_label' in df.columns:
-                df.loc[mask_null, 'predicted_sentiment'] = df.loc[mask_null, 'predicted_label'].map({
-                    0: 'Tiêu cực',
-                    1: 'Trung tính',
-                    2: 'Tích cực'
-                })
-                logger.info(f"✅ Fixed {mask_null.sum()} NULL values")
-        
-        # Chuẩn hóa sentiment (phần code cũ tiếp tục...)
-        df['predicted_sentiment'] = df['predicted_sentiment'].astype(str)
-        sentiment_map = {
-            'Negative': 'Tiêu cực',
-            'Neutral': 'Trung tính', 
-            'Positive': 'Tích cực',
-            'Tiêu cực': 'Tiêu cực',
-            'Trung tính': 'Trung tính',
-            'Tích cực': 'Tích cực',
-            '0': 'Tiêu cực',
-            '1': 'Trung tính',
-            '2': 'Tích cực',
-            'nan': 'Trung tính'  # ← THÊM mapping cho 'nan' string
-        }
-        df['predicted_sentiment'] = df['predicted_sentiment'].map(sentiment_map).fillna('Trung tính')
-        
-        
-        # BƯỚC 1: Tạo timeline đầy đủ từ ngày đầu đến ngày cuối
-        if len(df) > 0:
-            min_date = df['date'].min()
-            max_date = df['date'].max()
-            
-            # Tạo danh sách đầy đủ tất cả các ngày
-            all_dates = pd.date_range(start=min_date, end=max_date, freq='D').date
-            
-            # BƯỚC 2: Đếm số lượng bài viết theo ngày và sentiment
-            timeline_data = df.groupby(['date', 'predicted_sentiment']).size().reset_index(name='count')
-            
-            # BƯỚC 3: Tạo DataFrame đầy đủ với tất cả ngày và tất cả sentiment
-            sentiments = ['Tích cực', 'Trung tính', 'Tiêu cực']
-            
-            # Tạo MultiIndex với tất cả các kết hợp date x sentiment
-            full_index = pd.MultiIndex.from_product(
-                [all_dates, sentiments],
-                names=['date', 'predicted_sentiment']
-            )
-            
-            # Tạo DataFrame đầy đủ
-            timeline_full = pd.DataFrame(index=full_index).reset_index()
+    def update_timeline(data_version, sector, days, sentiment_type, rendered):
+        """Timeline số bài theo giờ/ngày/tuần (tùy khoảng thời gian) cho từng sentiment"""
+        def build():
+            # Đếm trên toàn bộ cửa sổ thời gian, không chỉ các bài mới nhất
+            df = get_filtered_data(sector, days, sentiment_type, limit=None, fields=())
             
-            # BƯỚC 4: Merge với dữ liệu thực tế và điền 0 cho missing values
-            timeline_full = timeline_full.merge(
-                timeline_data,
-                on=['date', 'predicted_sentiment'],
-                how='left'
-            ).fillna({'count': 0})
-            
-            # Convert count to int
-            timeline_full['count'] = timeline_full['count'].astype(int)
-            
-            # Convert date to datetime for plotly
-            timeline_full['date'] = pd.to_datetime(timeline_full['date'])
+            if df.empty or 'crawl_time' not in df.columns:
+                return go.Figure()
             
-            logger.info(f"Timeline data shape: {timeline_full.shape}")
-            logger.info(f"Date range: {timeline_full['date'].min()} to {timeline_full['date'].max()}")
-            logger.info(f"Sample data:\n{timeline_full.head(20)}")
+            bucket = bucket_for_days(days)
+            crawl_day = df['crawl_day'] if 'crawl_day' in df.columns else None
+            counts = count_timeline(df['crawl_time'], df['predicted_sentiment'], bucket, crawl_day)
+            if counts.empty:
+                return go.Figure()
             
-        else:
-            return go.Figure()
-        
-        # BƯỚC 5: Vẽ biểu đồ với hover chi tiết
-        fig = go.Figure()
-        
-        for sentiment in sentiments:
-            sentiment_data = timeline_full[timeline_full['predicted_sentiment'] == sentiment]
-            
-            # Tạo hover text chi tiết
-            hover_texts = []
-            for _, row in sentiment_data.iterrows():
-                hover_text = (
-                    f"<b>Ngày:</b> {row['date'].strftime('%d/%m/%Y')}<br>"
-                    f"<b>Sentiment:</b> {sentiment}<br>"
-                    f"<b>Số bài viết:</b> {row['count']}<br>"
-                    f"<extra></extra>"
-                )
-                hover_texts.append(hover_text)
-            
-            fig.add_trace(go.Scatter(
-                x=sentiment_data['date'],
-                y=sentiment_data['count'],
-                mode='lines+markers',
-                name=sentiment,
-                line=dict(
-                    color=SENTIMENT_COLORS[sentiment],
-                    width=2,
-                    shape='spline'  # Đường cong mượt hơn
+            logger.debug("Timeline %s buckets x %s sentiments (bucket=%s)", *counts.shape, bucket)
+            logger.debug("Timeline sample:\n%s", lazy(lambda: counts.head(20)))
+            
+            # Tỷ lệ của từng sentiment trong bucket, hiển thị khi hover
+            totals = counts.sum(axis=1).to_numpy()
+            shares = np.divide(counts.to_numpy(), totals[:, None], out=np.zeros(counts.shape), where=totals[:, None] > 0)
+            time_format = TIMELINE_HOVER_FORMATS[bucket]
+            
+            fig = go.Figure()
+            
+            for column, sentiment in enumerate(counts.columns):
+                fig.add_trace(go.Scatter(
+                    x=counts.index,
+                    y=counts[sentiment],
+                    mode='lines+markers',
+                    name=sentiment,
+                    line=dict(
+                        color=SENTIMENT_COLORS[sentiment],
+                        width=2,
+                        shape='spline'  # Đường cong mượt hơn
+                    ),
+                    marker=dict(
+                        size=6,
+                        symbol='circle',
+                        line=dict(width=1, color='white')
+                    ),
+                    customdata=shares[:, column] * 100,
+                    hovertemplate=(
+                        f'<b>{time_format}</b><br>'
+                        f'<b>Sentiment:</b> {sentiment}<br>'
+                        '<b>Số bài viết:</b> %{y} (%{customdata:.0f}%)<br>'
+                        '<extra></extra>'
+                    ),
+                    connectgaps=False  # Không nối các gap
+                ))
+            
+            fig.update_layout(
+                xaxis=dict(
+                    title=TIMELINE_AXIS_TITLES[bucket],
+                    tickformat='%d/%m %Hh' if bucket == 'H' else '%d/%m',
+                    tickangle=-45,
+                    showgrid=True,
+                    gridcolor='rgba(128, 128, 128, 0.2)'
                 ),
-                marker=dict(
-                    size=6,
-                    symbol='circle',
-                    line=dict(width=1, color='white')
+                yaxis=dict(
+                    title='Số lượng bài viết',
+                    showgrid=True,
+                    gridcolor='rgba(128, 128, 128, 0.2)',
+                    zeroline=True
                 ),
-                hovertemplate='%{text}',
-                text=hover_texts,
-                connectgaps=False  # Không nối các gap
-            ))
-        
-        # BƯỚC 6: Cấu hình layout
-        fig.update_layout(
-            xaxis=dict(
-                title='Ngày',
-                tickformat='%d/%m',
-                dtick='D1' if days <= 7 else 'D2' if days <= 30 else 'D7',  # Tự động điều chỉnh tick spacing
-                tickangle=-45,
-                showgrid=True,
-                gridcolor='rgba(128, 128, 128, 0.2)'
-            ),
-            yaxis=dict(
-                title='Số lượng bài viết',
-                showgrid=True,
-                gridcolor='rgba(128, 128, 128, 0.2)',
-                zeroline=True
-            ),
-            hovermode='x unified',  # Hiển thị tất cả values khi hover vào một ngày
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            height=400
-        )
+                hovermode='x unified',  # Hiển thị tất cả values khi hover vào một mốc thời gian
+                legend=dict(
+                    orientation="h",
+                    yanchor="bottom",
+                    y=1.02,
+                    xanchor="right",
+                    x=1
+                ),
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                height=400
+            )
+            
+            return fig
         
-        return fig
+        # Tải bài mới trước để token ứng với dữ liệu build() sẽ đọc
+        processed_frame.get()
+        # Cửa sổ thời gian tương đối: key đổi khi bucket đầu tiên trượt đi, kể cả khi không có bài mới
+        filters = (sector, days, sentiment_type, window_start(days).isoformat())
+        return render_figure('sentiment-timeline', filters, processed_frame.token, build, rendered)
     
     # Correlation Chart (Mock data for now)
     @app.callback(
         Output('correlation-chart', 'figure'),
-        Input('interval-component', 'n_intervals')
+        Input('data-version', 'data')
     )
-    def update_correlation(n):
+    def update_correlation(data_version):
         """Biểu đồ tương quan sentiment-giá (mock data)"""
         # Generate mock correlation data
         dates = pd.date_range(start='2024-01-01', periods=30, freq='D')
@@ -562,14 +528,14 @@ def register_enhanced_callbacks(app):
     # Enhanced News Table
     @app.callback(
         Output('enhanced-news-table', 'children'),
-        [Input('interval-component', 'n_intervals'),
+        [Input('data-version', 'data'),
         Input('sector-filter', 'value'),
         Input('time-filter', 'value'),
         Input('sentiment-filter', 'value')]
     )
-    def update_enhanced_table(n, sector, days, sentiment_type):
+    def update_enhanced_table(data_version, sector, days, sentiment_type):
         """Bảng tin tức nâng cao với tương tác - CẢI THIỆN"""
-        df = get_filtered_data(sector, days, sentiment_type, limit=20)
+        df = get_filtered_data(sector, days, sentiment_type, limit=20, fields=NEWS_TABLE_FIELDS)
         
         if df.empty:
             return html.P("Chưa có dữ liệu", className='text-muted text-center')
@@ -588,14 +554,12 @@ def register_enhanced_callbacks(app):
             title = row.get('title', 'N/A')
             truncated_title = title[:80] + '...' if len(title) > 80 else title
             
-            # SỬA: Hiển thị content thay vì summary nếu có
+            # Frame chỉ có summary (content nằm ở article_contents),
+            # độ dài content gốc nằm ở content_length
             content_text = ''
-            if 'content' in row and pd.notna(row['content']) and row['content']:
-                content_text = str(row['content'])[:200] + '...'
-                content_length = len(str(row['content']))
-            elif 'summary' in row and pd.notna(row['summary']):
+            if 'summary' in row and pd.notna(row['summary']) and row['summary']:
                 content_text = str(row['summary'])[:200] + '...'
-                content_length = len(str(row['summary']))
+                content_length = int(row.get('content_length') or len(str(row['summary'])))
             else:
                 content_text = "Không có nội dung"
                 content_length = 0
@@ -665,12 +629,17 @@ def register_enhanced_callbacks(app):
             return alert, alert
         
         try:
-            # Parse URL
-            result = url_parser.parse_url(url)
+            # Parse + preprocess + sentiment (dùng kết quả đã lưu nếu URL đã được phân tích)
+            analysis = url_memo.analyze(url)
             
-            if not result['success']:
-                error_alert = dbc.Alert(f"Lỗi: {result.get('error', 'Không thể trích xuất nội dung')}", color='danger')
+            if not analysis['success']:
+                error_alert = dbc.Alert(f"Lỗi: {analysis.get('error', 'Không thể trích xuất nội dung')}", color='danger')
                 return error_alert, error_alert
+            
+            result = analysis['result']
+            processed = analysis['processed']
+            sentiment = analysis['sentiment']
+            sentiment_label = SENTIMENT_LABELS[sentiment['label']]
 
             # Kiểm tra content
             if not result.get('content') or len(result['content']) < 100:
@@ -681,70 +650,15 @@ def register_enhanced_callbacks(app):
             else:
                 warning_alert = None
             
-            logger.info(f"[URL PARSE] Extracted {len(result['content'])} chars from {url}")
-
-            # Save raw data to news_articles
-            raw_data = {
-                'source': result['source'],
-                'title': result['title'],
-                'summary': result.get('summary', result['content'][:200]),
-                'content': result['content'],  # THÊM: Lưu full content
-                'link': url,
-                'crawl_time': datetime.now()
-            }
-            df_raw = pd.DataFrame([raw_data])
-            db_manager.save_news_data(df_raw)
-            
-            # Preprocess - SỬA: Sử dụng full content
-            full_text = f"{result['title']} {result['content']}"
-            processed = preprocessor.preprocess_pipeline(full_text)
-            
-            logger.info(f"[PREPROCESS] Cleaned text: {len(processed['cleaned_text'])} chars")
-            logger.info(f"[PREPROCESS] Detected sectors: {processed['sectors']}")
-            
-            # Analyze sentiment
-            sentiment = sentiment_analyzer.analyze(full_text)
-            sentiment_label = SENTIMENT_LABELS[sentiment['label']]
-            
+            logger.info(f"[URL PARSE] {len(result['content'])} chars from {url} (memo: {analysis['from_memo']})")
             logger.info(f"[SENTIMENT] Label: {sentiment_label} | Scores: {sentiment}")
             
             # Extract keywords
             keywords = extract_keywords(processed['cleaned_text'])
             
-            # Save processed data
-            processed_data = {
-                'source': result['source'],
-                'title': result['title'],
-                'content': result['content'],
-                'summary': result.get('summary', result['content'][:500]),
-                'link': url,
-                'crawl_time': datetime.now(),
-                'cleaned_text': processed['cleaned_text'],
-                'sentiment_positive': float(sentiment['positive']),
-                'sentiment_negative': float(sentiment['negative']),
-                'sentiment_neutral': float(sentiment['neutral']),
-                'predicted_label': sentiment['label'],
-                'predicted_sentiment': sentiment_label,  # ← ĐÃ CÓ DÒNG NÀY
-                'sectors': ','.join(processed['sectors']) if processed['sectors'] else 'Other',
-                'processed_at': datetime.now()
-            }
-            df_processed = pd.DataFrame([processed_data])
-            db_manager.save_processed_data(df_processed)
-
-            # Save prediction data
-            prediction_data = {
-                'article_id': url,
-                'predicted_label': sentiment['label'],
-                'predicted_sentiment': sentiment_label,
-                'confidence_scores': {
-                    'positive': float(sentiment['positive']),
-                    'negative': float(sentiment['negative']),
-                    'neutral': float(sentiment['neutral'])
-                },
-                'model_version': '1.0',
-                'predicted_at': datetime.now()
-            }
-            db_manager.save_predictions(prediction_data)
+            # Bài đã lưu từ lần phân tích trước, không ghi lại
+            if not analysis['from_memo']:
+                save_url_analysis(url, result, processed, sentiment, sentiment_label)
             
             # Basic result
             basic_result = dbc.Alert([
@@ -828,159 +742,127 @@ def register_enhanced_callbacks(app):
             error_alert = dbc.Alert(f"Lỗi xử lý: {str(e)}", color='danger')
             return error_alert, error_alert
     
-@cache_result(timeout=PERFORMANCE_CONFIG['cache_timeout'])
-def get_filtered_data(sector='all', days=30, sentiment_type='all', limit=1000):
-    """Lấy dữ liệu đã lọc theo các tiêu chí với cache - CẢI THIỆN"""
-    # Try cache first
-    cache_key = f"filtered_data_{sector}_{days}_{sentiment_type}_{limit}"
-    cached_result = dashboard_cache.get(cache_key)
-    if cached_result is not None:
-        logger.info(f"Cache hit for: {cache_key}")
-        return cached_result
-    
-    logger.info(f"Loading data with filters: sector={sector}, days={days}, sentiment={sentiment_type}")
-    
-    df = db_manager.load_processed_data(limit=limit)
-    
+def save_url_analysis(url, result, processed, sentiment, sentiment_label):
+    """Ghi bài phân tích từ URL vào news_articles, processed_articles và predictions"""
+    # Save raw data to news_articles
+    raw_data = {
+        'source': result['source'],
+        'title': result['title'],
+        'summary': result.get('summary', result['content'][:200]),
+        'content': result['content'],
+        'link': url,
+        'crawl_time': utc_now()
+    }
+    write_queue.enqueue('news_articles', raw_data)
+
+    # Save processed data
+    processed_data = {
+        'source': result['source'],
+        'title': result['title'],
+        'content': result['content'],
+        'summary': result.get('summary', result['content'][:500]),
+        'link': url,
+        'crawl_time': utc_now(),
+        'cleaned_text': processed['cleaned_text'],
+        'sentiment_positive': float(sentiment['positive']),
+        'sentiment_negative': float(sentiment['negative']),
+        'sentiment_neutral': float(sentiment['neutral']),
+        'predicted_label': sentiment['label'],
+        'sectors': processed['sectors'],
+        'processed_at': datetime.now()
+    }
+    write_queue.enqueue('processed_articles', processed_data)
+
+    # Save prediction data
+    prediction_data = {
+        'article_id': url,
+        'predicted_label': sentiment['label'],
+        'predicted_sentiment': sentiment_label,
+        'confidence_scores': {
+            'positive': float(sentiment['positive']),
+            'negative': float(sentiment['negative']),
+            'neutral': float(sentiment['neutral'])
+        },
+        'model_version': '1.0',
+        'predicted_at': datetime.now()
+    }
+    write_queue.enqueue('predictions', prediction_data)
+
+def render_figure(chart_id, filters, version, build, rendered):
+    """
+    Figure cho callback biểu đồ: no_update nếu client đang hiển thị đúng
+    figure này (rendered là key lưu ở Store '<chart_id>-rendered')
+
+    Returns: (figure, key) cho hai Output figure và data của Store
+    """
+    key = figure_key(chart_id, filters, version)
+    if rendered == key:
+        return no_update, no_update
+    return get_figure(key, build), key
+
+def current_data_version():
+    """
+    Token dữ liệu dashboard: updated_at lớn nhất + số dòng của processed_frame,
+    kèm giờ bắt đầu của cửa sổ thời gian nhỏ nhất (window_start(1))
+
+    Đổi khi có bài mới, bài được cập nhật (re-crawl, gán lại nhãn) hoặc bị
+    xóa, và mỗi giờ khi cửa sổ thời gian trượt (bài cũ ra khỏi bộ lọc 24h/7
+    ngày dù không có bài mới); giống nhau giữa các worker đã tải cùng dữ
+    liệu. Dữ liệu đổi thì bucket aggregate của process này được tính lại để
+    các biểu đồ aggregate cập nhật cùng lúc với frame.
+    """
+    global _seen_data_version
+    processed_frame.get()
+    token = processed_frame.token
+    if token != _seen_data_version:
+        if _seen_data_version is not None:
+            aggregates.invalidate()
+        _seen_data_version = token
+    return f"{token}_{window_start(1).isoformat()}"
+
+def add_warmup_steps(warmup):
+    """
+    Các bước nạp sẵn dữ liệu cho view mặc định ('all', 30 ngày, 'all')
+
+    processed_frame phục vụ mọi tổ hợp sector/sentiment, bucket aggregate
+    phục vụ mọi tổ hợp trong cùng một khoảng thời gian nên chỉ cần nạp
+    theo các giá trị time-filter.
+    """
+    warmup.add_step('processed_frame', processed_frame.get)
+    for days in WARMUP_CONFIG['days']:
+        warmup.add_step(f'aggregates_{days}d', lambda days=days: aggregates.get_buckets(days))
+    warmup.add_step('default_view', lambda: get_filtered_data('all', 30, 'all', fields=()))
+
+def invalidate_dashboard_data(changes):
+    """
+    Listener của change_watcher: làm mới dữ liệu dashboard của process này
+
+    Bài mới chỉ cần tải thêm vào processed_frame. Update/delete không đổi
+    processed_at nên frame phải tải lại từ đầu.
+    """
+    aggregates.invalidate()
+    if changes.get('updated') or changes.get('deleted'):
+        processed_frame.reset()
+    else:
+        processed_frame.refresh(force=True)
+
+def get_filtered_data(sector='all', days=30, sentiment_type='all', limit=1000, fields=None):
+    """
+    Lấy dữ liệu đã lọc theo các tiêu chí - CẢI THIỆN
+
+    Mọi bộ lọc dùng chung một frame đã chuẩn hóa (processed_frame, chỉ tải
+    thêm bài mới mỗi lần refresh) thay vì cache một DataFrame cho mỗi tổ hợp.
+    fields: các cột bổ sung ngoài BASE_FIELDS cần trả về (None = toàn bộ cột)
+    """
+    df = processed_frame.get()
     if df.empty:
         logger.warning("No data loaded from database")
         return df
     
-    logger.info(f"Loaded {len(df)} records from database")
-    logger.info(f"Columns available: {df.columns.tolist()}")
-    
-    # Optimize DataFrame
-    df = optimize_dataframe(df)
-    
-    # BƯỚC 1: Đảm bảo có cột predicted_sentiment và chuẩn hóa sang tiếng Việt
-    if 'predicted_sentiment' not in df.columns:
-        if 'predicted_label' in df.columns:
-            df['predicted_sentiment'] = df['predicted_label'].map({
-                0: 'Tiêu cực', 
-                1: 'Trung tính', 
-                2: 'Tích cực'
-            })
-            logger.info("Created predicted_sentiment from predicted_label")
-        else:
-            logger.warning("Neither predicted_sentiment nor predicted_label found in data")
-            df['predicted_sentiment'] = 'Trung tính'
-    else:
-        # Convert to string first to avoid Categorical issues
-        df['predicted_sentiment'] = df['predicted_sentiment'].astype(str)
-        sentiment_map = {
-            'Negative': 'Tiêu cực',
-            'Neutral': 'Trung tính', 
-            'Positive': 'Tích cực',
-            'Tiêu cực': 'Tiêu cực',
-            'Trung tính': 'Trung tính',
-            'Tích cực': 'Tích cực'
-        }
-        df['predicted_sentiment'] = df['predicted_sentiment'].map(sentiment_map).fillna('Trung tính')
-        logger.info(f"Normalized predicted_sentiment. Unique values: {df['predicted_sentiment'].unique().tolist()}")
-    
-    # BƯỚC 2: Xử lý cột sectors
-    if 'sectors' not in df.columns:
-        logger.warning("No sectors column found, creating default")
-        df['sectors'] = 'Other'
-    else:
-        def normalize_sector(sector_value):
-            """Chuẩn hóa giá trị sector - CẢI THIỆN"""
-            try:
-                # Xử lý giá trị rỗng
-                if pd.isna(sector_value) or sector_value == '' or sector_value == 'nan':
-                    return 'Other'
-                
-                # Convert to string
-                sector_str = str(sector_value).strip()
-                
-                # Nếu là chuỗi rỗng sau khi strip
-                if not sector_str or sector_str == 'nan':
-                    return 'Other'
-                
-                # THÊM: Mapping tiếng Việt -> tiếng Anh
-                vn_to_en_map = {
-                    'bất_động_sản': 'Real Estate',
-                    'ngân_hàng': 'Banking',
-                    'chứng_khoán': 'Finance',
-                    'công_nghệ': 'Technology',
-                    'sản_xuất': 'Manufacturing',
-                    'năng_lượng': 'Energy',
-                    'vận_tải': 'Transportation',
-                    'nông_nghiệp': 'Agriculture',
-                    'bán_lẻ': 'Retail',
-                    'tổng_hợp': 'Other'
-                }
-                
-                # Nếu chứa dấu phẩy (comma-separated), lấy ngành đầu tiên
-                if ',' in sector_str:
-                    sectors_list = [s.strip() for s in sector_str.split(',')]
-                    main_sector = sectors_list[0] if sectors_list else 'Other'
-                else:
-                    main_sector = sector_str
-                
-                # Mapping tiếng Việt sang tiếng Anh
-                if main_sector in vn_to_en_map:
-                    main_sector = vn_to_en_map[main_sector]
-                
-                # Mapping thêm từ SECTOR_MAPPINGS
-                mapped_sector = SECTOR_MAPPINGS.get(main_sector, main_sector)
-                
-                # Kiểm tra mapped_sector có hợp lệ không
-                valid_sectors = ['Banking', 'Real Estate', 'Finance', 'Technology', 
-                            'Manufacturing', 'Energy', 'Transportation', 
-                            'Agriculture', 'Retail', 'Other']
-                
-                if mapped_sector in valid_sectors:
-                    return mapped_sector
-                else:
-                    return 'Other'
-                    
-            except Exception as e:
-                logger.error(f"Error normalizing sector '{sector_value}': {e}")
-                return 'Other'
-            
-        df['sectors'] = df['sectors'].apply(normalize_sector)
-        logger.info(f"Normalized sectors. Unique values: {df['sectors'].unique().tolist()}")
-    
-    # BƯỚC 3: Filter by time
-    if 'crawl_time' in df.columns:
-        try:
-            cutoff_date = datetime.now() - timedelta(days=days)
-            df['crawl_time'] = pd.to_datetime(df['crawl_time'], errors='coerce')
-            # Loại bỏ các giá trị NaT (Not a Time)
-            df = df[df['crawl_time'].notna()]
-            df = df[df['crawl_time'] >= cutoff_date]
-            logger.info(f"After time filter: {len(df)} records (from {cutoff_date} to now)")
-        except Exception as e:
-            logger.error(f"Error filtering by time: {e}")
-    
-    # BƯỚC 4: Filter by sector
-    if sector != 'all':
-        before_count = len(df)
-        df = df[df['sectors'] == sector]
-        logger.info(f"Sector filter '{sector}': {before_count} -> {len(df)} records")
-    
-    # BƯỚC 5: Filter by sentiment (chuẩn hóa tiếng Việt)
-    if sentiment_type != 'all':
-        before_count = len(df)
-        # Đảm bảo sentiment_type là tiếng Việt
-        sentiment_map = {
-            'Negative': 'Tiêu cực',
-            'Neutral': 'Trung tính', 
-            'Positive': 'Tích cực',
-            'Tiêu cực': 'Tiêu cực',
-            'Trung tính': 'Trung tính',
-            'Tích cực': 'Tích cực'
-        }
-        normalized_sentiment = sentiment_map.get(sentiment_type, sentiment_type)
-        df = df[df['predicted_sentiment'] == normalized_sentiment]
-        logger.info(f"Sentiment filter '{sentiment_type}' (normalized: '{normalized_sentiment}'): {before_count} -> {len(df)} records")
-    
-    logger.info(f"Final filtered data: {len(df)} records")
-    
-    # Cache result
-    dashboard_cache.set(cache_key, df)
+    columns = None if fields is None else list(BASE_FIELDS) + list(fields) + ['content_length']
+    df = processed_frame.select(sector, days, sentiment_type, limit, columns)
     
+    logger.debug("Filtered data (sector=%s, days=%s, sentiment=%s): %d records", sector, days, sentiment_type, len(df))
     return df
 
 def highlight_sentiment_words(text):
@@ -5,6 +5,16 @@ from dash import html, dcc
 import dash_bootstrap_components as dbc
 from datetime import datetime, timedelta
 
+# Các biểu đồ dùng figure cache (mỗi biểu đồ có một Store '<id>-rendered')
+CACHED_FIGURES = (
+    'sentiment-gauge-chart',
+    'sentiment-pie-chart',
+    'sector-pie-chart',
+    'sector-heatmap',
+    'sector-bar-chart',
+    'sentiment-timeline'
+)
+
 def create_navbar():
     """Tạo navigation bar"""
     return dbc.NavbarSimple(
@@ -50,6 +60,7 @@ def create_sidebar():
                 dcc.Dropdown(
                     id='time-filter',
                     options=[
+                        {'label': '24 giờ', 'value': 1},
                         {'label': '7 ngày', 'value': 7},
                         {'label': '30 ngày', 'value': 30},
                         {'label': '90 ngày', 'value': 90}
@@ -256,6 +267,12 @@ def create_dashboard_layout():
             n_intervals=0
         ),
         
+        # Token dữ liệu (poll theo interval), các biểu đồ chỉ cập nhật khi token đổi
+        dcc.Store(id='data-version'),
+        
+        # Key của figure đang hiển thị ở client (bỏ qua cập nhật khi không đổi)
+        *[dcc.Store(id=f'{chart_id}-rendered') for chart_id in CACHED_FIGURES],
+        
         # Modal for article details
         dbc.Modal([
             dbc.ModalHeader(dbc.ModalTitle("Chi tiết bài viết")),
@@ -553,6 +570,12 @@ def create_dashboard_layout():
             n_intervals=0
         ),
         
+        # Token dữ liệu (poll theo interval), các biểu đồ chỉ cập nhật khi token đổi
+        dcc.Store(id='data-version'),
+        
+        # Key của figure đang hiển thị ở client (bỏ qua cập nhật khi không đổi)
+        *[dcc.Store(id=f'{chart_id}-rendered') for chart_id in CACHED_FIGURES],
+        
         # Modal for article details
         dbc.Modal([
             dbc.ModalHeader(dbc.ModalTitle("Chi tiết bài viết")),
@@ -1,6 +1,13 @@
 from config.database import MongoDBConfig
-from datetime import datetime
+from config.settings import SECTOR_MAPPINGS, SENTIMENT_LABELS, DATABASE_CONFIG
+from src.utils.helpers import make_article_key, utc_now
+from src.utils.logging_utils import lazy
+from src.database.schema import CONTENT_COLLECTION, encode_processed, normalize_crawl_time
+from datetime import datetime, timedelta
+import re
 import pandas as pd
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 from dotenv import load_dotenv
 import logging
 
@@ -9,11 +16,167 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Tên sentiment tiếng Anh cũ -> nhãn số
+SENTIMENT_ALIASES = {
+    'Negative': 0,
+    'Neutral': 1,
+    'Positive': 2
+}
+
+def _sector_aliases():
+    """Gom các giá trị sectors thô (tiếng Việt/tiếng Anh) theo ngành chuẩn"""
+    aliases = {}
+    for raw_value, sector in SECTOR_MAPPINGS.items():
+        aliases.setdefault(sector, []).append(raw_value)
+    return aliases
+
+SECTOR_ALIASES = _sector_aliases()
+
+def _first_sector_regex(raw_values):
+    """Regex khớp ngành đầu tiên trong chuỗi sectors phân tách bằng dấu phẩy"""
+    pattern = '|'.join(re.escape(value) for value in raw_values)
+    return re.compile(rf'^\s*({pattern})\s*(,|$)')
+
+def crawl_cutoff(days):
+    """Mốc crawl_time (UTC, không tz như BSON date) của cửa sổ days ngày gần nhất"""
+    return utc_now().replace(tzinfo=None) - timedelta(days=days)
+
+def build_processed_query(sector='all', days=None, sentiment='all'):
+    """
+    Tạo filter MongoDB cho processed_articles
+
+    Ngữ nghĩa giống get_filtered_data: sector so khớp ngành chính (trường
+    sector của schema v2, ngành đầu tiên trong chuỗi sectors với document cũ),
+    sentiment so khớp predicted_sentiment (hoặc predicted_label khi thiếu).
+    """
+    conditions = []
+
+    if days:
+        # crawl_time luôn là date UTC (chuẩn hóa khi ghi), lọc bằng range trên index
+        conditions.append({'crawl_time': {'$gte': crawl_cutoff(days)}})
+
+    if sector and sector != 'all':
+        if sector == 'Other':
+            known = [value for name, values in SECTOR_ALIASES.items()
+                     if name != 'Other' for value in values]
+            legacy = {'sectors': {'$not': _first_sector_regex(known)}}
+        else:
+            raw_values = SECTOR_ALIASES.get(sector, [sector])
+            legacy = {'sectors': _first_sector_regex(raw_values)}
+        conditions.append({'$or': [
+            {'sector': sector},
+            {'sector': {'$exists': False}, **legacy}
+        ]})
+
+    if sentiment and sentiment != 'all':
+        label = SENTIMENT_ALIASES.get(sentiment)
+        if label is None:
+            label = next((key for key, name in SENTIMENT_LABELS.items() if name == sentiment), None)
+        if label is not None:
+            names = [SENTIMENT_LABELS[label]] + [name for name, value in SENTIMENT_ALIASES.items() if value == label]
+            conditions.append({'$or': [
+                {'predicted_sentiment': {'$in': names}},
+                {'predicted_sentiment': {'$in': [None, 'nan']}, 'predicted_label': label}
+            ]})
+        else:
+            conditions.append({'predicted_sentiment': sentiment})
+
+    if not conditions:
+        return {}
+    if len(conditions) == 1:
+        return conditions[0]
+    return {'$and': conditions}
+
+def build_projection(fields):
+    """Projection MongoDB từ danh sách cột (None = lấy toàn bộ)"""
+    if fields is None:
+        return None
+    projection = {field: 1 for field in fields}
+    # Chỉ giữ _id khi được yêu cầu rõ ràng
+    projection.setdefault('_id', 0)
+    return projection
+
+# Trường chỉ ghi khi tạo mới document (re-crawl giữ giá trị của lần ghi đầu)
+INSERT_ONLY_FIELDS = ('crawl_time', 'crawl_day', 'created_at', 'processed_at')
+
+def _upsert_operation(record):
+    """
+    UpdateOne(upsert) theo article_key, InsertOne nếu không xác định được khóa
+
+    Mọi lần ghi đặt updated_at (cùng đồng hồ với processed_at) để
+    processed_frame tải lại cả bài được cập nhật, không chỉ bài mới.
+    """
+    record = {field: value for field, value in record.items() if field != '_id'}
+    record['updated_at'] = datetime.now()
+    key = record.get('article_key') or make_article_key(record)
+    if not key:
+        return None, InsertOne(record)
+    
+    record['article_key'] = key
+    set_fields = {field: value for field, value in record.items() if field not in INSERT_ONLY_FIELDS}
+    insert_fields = {field: value for field, value in record.items() if field in INSERT_ONLY_FIELDS}
+    
+    update = {'$set': set_fields}
+    if insert_fields:
+        update['$setOnInsert'] = insert_fields
+    return key, UpdateOne({'article_key': key}, update, upsert=True)
+
 class DatabaseManager:
     def __init__(self):
         self.config = MongoDBConfig()
         self.db = self.config.get_database()
     
+    def ensure_indexes(self):
+        """Tạo các index cần thiết (idempotent)"""
+        from src.database.indexes import ensure_indexes
+        return ensure_indexes(self.db)
+    
+    def bulk_upsert(self, collection_name, records, batch_size=None):
+        """
+        Ghi records bằng bulk_write UpdateOne(upsert=True) theo article_key
+
+        Các batch chạy unordered; bản ghi trùng khóa trong cùng batch chỉ giữ bản cuối.
+        Returns: dict {'inserted', 'updated', 'skipped', 'errors'}
+        """
+        summary = {'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': 0}
+        collection = self.config.get_collection(collection_name)
+        if collection is None:
+            summary['errors'] = len(records)
+            return summary
+        
+        batch_size = batch_size or DATABASE_CONFIG['bulk_batch_size']
+        
+        for start in range(0, len(records), batch_size):
+            operations = {}
+            keyless = []
+            for record in records[start:start + batch_size]:
+                key, operation = _upsert_operation(record)
+                if key is None:
+                    keyless.append(operation)
+                    continue
+                if key in operations:
+                    summary['skipped'] += 1
+                operations[key] = operation
+            
+            batch = list(operations.values()) + keyless
+            try:
+                result = collection.bulk_write(batch, ordered=False)
+                details = result.bulk_api_result
+            except BulkWriteError as e:
+                details = e.details
+                for error in details.get('writeErrors', []):
+                    # Trùng khóa do process khác vừa ghi cùng bài viết
+                    if error.get('code') == 11000:
+                        summary['skipped'] += 1
+                    else:
+                        summary['errors'] += 1
+            
+            summary['inserted'] += details.get('nUpserted', 0) + details.get('nInserted', 0)
+            summary['updated'] += details.get('nModified', 0)
+            summary['skipped'] += details.get('nMatched', 0) - details.get('nModified', 0)
+        
+        return summary
+    
     def save_news_data(self, df_news):
         """Lưu dữ liệu tin tức vào MongoDB - CẢI THIỆN"""
         try:
@@ -22,18 +185,22 @@ class DatabaseManager:
                 print("Không thể kết nối đến collection news_articles")
                 return False
         
-            # Chuyển DataFrame thành dict
-            records = df_news.to_dict('records')
+            # Chuyển DataFrame thành dict (chấp nhận cả list records từ write queue)
+            if isinstance(df_news, pd.DataFrame):
+                records = df_news.to_dict('records')
+            else:
+                records = list(df_news)
             for record in records:
                 record['created_at'] = datetime.now()
-                
-                # DEBUG: Log content length
-                if 'content' in record:
-                    logger.info(f"Saving article with {len(record['content'])} chars content")
+                record['article_key'] = make_article_key(record)
+                normalize_crawl_time(record)
+            logger.debug("Saving %d news articles, content lengths: %s", len(records),
+                         lazy(lambda: [len(record.get('content') or '') for record in records]))
             
-            result = collection.insert_many(records)
-            print(f"✓ Đã lưu {len(result.inserted_ids)} bài viết vào news_articles")
-            return True
+            summary = self.bulk_upsert('news_articles', records)
+            print(f"✓ news_articles: thêm {summary['inserted']}, cập nhật {summary['updated']}, "
+                  f"bỏ qua {summary['skipped']} bài trùng")
+            return summary['errors'] == 0
         except Exception as e:
             print(f"❌ Lỗi lưu dữ liệu: {e}")
             return False
@@ -53,18 +220,26 @@ class DatabaseManager:
             else:
                 records = [df_processed]
             
+            documents = []
+            contents = []
             for record in records:
                 record['processed_at'] = datetime.now()
+                record['article_key'] = make_article_key(record)
                 
-                # DEBUG: Log để kiểm tra content và sectors
-                if 'content' in record:
-                    logger.info(f"[SAVE] Content length: {len(record['content'])} chars")
-                if 'sectors' in record:
-                    logger.info(f"[SAVE] Sectors: {record['sectors']}")
+                # Schema v2: content đầy đủ lưu riêng ở article_contents
+                document, content = encode_processed(record)
+                documents.append(document)
+                if content:
+                    contents.append(content)
+            logger.debug("Saving %d processed articles, sectors: %s", len(documents),
+                         lazy(lambda: [document['sectors'] for document in documents]))
             
-            result = collection.insert_many(records)
-            print(f"✓ Đã lưu {len(result.inserted_ids)} bài viết đã xử lý")
-            return True
+            if contents:
+                self.bulk_upsert(CONTENT_COLLECTION, contents)
+            summary = self.bulk_upsert('processed_articles', documents)
+            print(f"✓ processed_articles: thêm {summary['inserted']}, cập nhật {summary['updated']}, "
+                  f"bỏ qua {summary['skipped']} bài trùng")
+            return summary['errors'] == 0
         except Exception as e:
             print(f"❌ Lỗi lưu dữ liệu xử lý: {e}")
             return False
@@ -85,9 +260,9 @@ class DatabaseManager:
                 df = pd.DataFrame(data)
                 df.drop('_id', axis=1, inplace=True, errors='ignore')
                 
-                # DEBUG: Check content
                 if 'content' in df.columns:
-                    logger.info(f"Loaded {len(df)} articles with avg content length: {df['content'].str.len().mean():.0f}")
+                    logger.debug("Loaded %d articles, avg content length: %s", len(df),
+                                 lazy(lambda: f"{df['content'].str.len().mean():.0f}"))
                 
                 return df
             return pd.DataFrame()
@@ -95,14 +270,20 @@ class DatabaseManager:
             print(f"❌ Lỗi tải dữ liệu: {e}")
             return pd.DataFrame()
     
-    def load_processed_data(self, limit=None):
-        """Tải dữ liệu đã xử lý từ MongoDB"""
+    def load_processed_data(self, limit=None, sector='all', days=None, sentiment='all', fields=None):
+        """
+        Tải dữ liệu đã xử lý từ MongoDB
+
+        Bộ lọc sector/days/sentiment và projection fields được đẩy xuống
+        câu lệnh find để chỉ truyền về những cột cần thiết.
+        """
         try:
             collection = self.config.get_collection('processed_articles')
             if collection is None:
                 return pd.DataFrame()
             
-            cursor = collection.find().sort('processed_at', -1)
+            query = build_processed_query(sector=sector, days=days, sentiment=sentiment)
+            cursor = collection.find(query, build_projection(fields)).sort('processed_at', -1)
             if limit:
                 cursor = cursor.limit(limit)
             
@@ -111,9 +292,9 @@ class DatabaseManager:
                 df = pd.DataFrame(data)
                 df.drop('_id', axis=1, inplace=True, errors='ignore')
                 
-                # DEBUG: Check content
                 if 'content' in df.columns:
-                    logger.info(f"Loaded {len(df)} processed with avg content: {df['content'].str.len().mean():.0f}")
+                    logger.debug("Loaded %d processed, avg content length: %s", len(df),
+                                 lazy(lambda: f"{df['content'].str.len().mean():.0f}"))
                 
                 return df
             return pd.DataFrame()
@@ -121,6 +302,48 @@ class DatabaseManager:
             print(f"❌ Lỗi tải dữ liệu đã xử lý: {e}")
             return pd.DataFrame()
     
+    def _iter_frames(self, collection_name, query, projection, sort_field, batch_size, limit):
+        """Đọc cursor theo từng batch, mỗi batch trả về một DataFrame"""
+        collection = self.config.get_collection(collection_name)
+        if collection is None:
+            return
+        
+        cursor = collection.find(query or {}, build_projection(projection)).batch_size(batch_size)
+        if sort_field:
+            cursor = cursor.sort(sort_field, -1)
+        if limit:
+            cursor = cursor.limit(limit)
+        
+        keep_id = projection is not None and '_id' in projection
+        
+        def to_frame(docs):
+            df = pd.DataFrame(docs)
+            if not keep_id:
+                df.drop('_id', axis=1, inplace=True, errors='ignore')
+            return df
+        
+        batch = []
+        for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                yield to_frame(batch)
+                batch = []
+        if batch:
+            yield to_frame(batch)
+    
+    def iter_processed(self, batch_size=1000, projection=None, query=None, limit=None, sort=True):
+        """
+        Duyệt processed_articles theo từng DataFrame batch
+
+        projection: danh sách cột cần lấy (thêm '_id' nếu cần cập nhật lại document)
+        sort: sắp xếp processed_at giảm dần; tắt khi chỉ cần quét toàn bộ
+        """
+        try:
+            sort_field = 'processed_at' if sort else None
+            yield from self._iter_frames('processed_articles', query, projection, sort_field, batch_size, limit)
+        except Exception as e:
+            print(f"❌ Lỗi đọc dữ liệu đã xử lý theo batch: {e}")
+    
     def save_predictions(self, predictions_data):
         """Lưu kết quả dự đoán"""
         try:
@@ -132,6 +355,11 @@ class DatabaseManager:
                 predictions_data['predicted_at'] = datetime.now()
                 collection.insert_one(predictions_data)
                 return True
+            if isinstance(predictions_data, list) and predictions_data:
+                for prediction in predictions_data:
+                    prediction.setdefault('predicted_at', datetime.now())
+                collection.insert_many(predictions_data, ordered=False)
+                return True
             return False
         except Exception as e:
             print(f"❌ Lỗi lưu dự đoán: {e}")
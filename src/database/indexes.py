@@ -0,0 +1,147 @@
+"""
+Quản lý index MongoDB cho các collection chính
+"""
+import logging
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from src.database.db_manager import build_processed_query
+from src.database.schema import CONTENT_COLLECTION
+from src.services.url_memo import MEMO_COLLECTION
+
+logger = logging.getLogger(__name__)
+
+# Chỉ áp dụng unique cho document đã có article_key (dữ liệu cũ không bị chặn)
+_HAS_ARTICLE_KEY = {'article_key': {'$type': 'string'}}
+
+# Index khai báo theo đúng dạng query thực tế
+INDEX_SPECS = {
+    'processed_articles': [
+        # load_processed_data: sort processed_at
+        IndexModel([('processed_at', DESCENDING)], name='processed_at_desc'),
+        # processed_frame: tải các bài được ghi/cập nhật từ lần refresh trước
+        IndexModel([('updated_at', DESCENDING)], name='updated_at_desc'),
+        # Dashboard: lọc cửa sổ thời gian
+        IndexModel([('crawl_time', DESCENDING)], name='crawl_time_desc'),
+        # Dashboard: lọc ngành chính + thời gian (schema v2)
+        IndexModel([('sector', ASCENDING), ('crawl_time', DESCENDING)], name='sector_crawl_time'),
+        # Mảng mã ngành (schema v2, multikey) và chuỗi sectors của document cũ
+        IndexModel([('sectors', ASCENDING), ('crawl_time', DESCENDING)], name='sectors_crawl_time'),
+        # Dashboard: lọc sentiment + thời gian, fix_missing_sentiment: tìm giá trị null
+        IndexModel([('predicted_sentiment', ASCENDING), ('crawl_time', DESCENDING)], name='sentiment_crawl_time'),
+        # Dashboard: lọc sentiment theo predicted_label (schema v2)
+        IndexModel([('predicted_label', ASCENDING), ('crawl_time', DESCENDING)], name='label_crawl_time'),
+        # migrate_schema: tìm document chưa chuyển sang schema mới
+        IndexModel([('schema_version', ASCENDING)], name='schema_version'),
+        IndexModel([('article_key', ASCENDING)], name='article_key_unique',
+                   unique=True, partialFilterExpression=_HAS_ARTICLE_KEY)
+    ],
+    'news_articles': [
+        # load_news_data: sort created_at
+        IndexModel([('created_at', DESCENDING)], name='created_at_desc'),
+        IndexModel([('article_key', ASCENDING)], name='article_key_unique',
+                   unique=True, partialFilterExpression=_HAS_ARTICLE_KEY)
+    ],
+    CONTENT_COLLECTION: [
+        IndexModel([('article_key', ASCENDING)], name='article_key_unique', unique=True)
+    ],
+    MEMO_COLLECTION: [
+        IndexModel([('url_key', ASCENDING)], name='url_key_unique', unique=True),
+        # Xóa kết quả phân tích URL khi quá hạn
+        IndexModel([('expires_at', ASCENDING)], name='expires_at_ttl', expireAfterSeconds=0)
+    ],
+    'predictions': [
+        IndexModel([('article_id', ASCENDING), ('predicted_at', DESCENDING)], name='article_predicted_at')
+    ]
+}
+
+def ensure_indexes(db):
+    """
+    Tạo các index trong INDEX_SPECS (idempotent)
+
+    Mỗi index được tạo riêng để một index lỗi (vd. trùng khóa unique)
+    không chặn các index còn lại. Trả về dict collection -> tên index đã có.
+    """
+    if db is None:
+        logger.warning("Không có kết nối database, bỏ qua ensure_indexes")
+        return {}
+
+    result = {}
+    for collection_name, models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        created = []
+        for model in models:
+            try:
+                created.extend(collection.create_indexes([model]))
+            except OperationFailure as e:
+                logger.warning(f"Không tạo được index {model.document['name']} trên {collection_name}: {e}")
+        result[collection_name] = created
+
+    logger.info(f"Indexes ensured: {result}")
+    return result
+
+def dashboard_queries():
+    """Các query chính của dashboard/scripts để theo dõi execution plan"""
+    return [
+        ('Dashboard mặc định (30 ngày)', 'processed_articles',
+         build_processed_query(days=30), [('processed_at', DESCENDING)], 1000),
+        ('Lọc ngành Banking (30 ngày)', 'processed_articles',
+         build_processed_query(sector='Banking', days=30), [('processed_at', DESCENDING)], 1000),
+        ('Lọc ngành Other (30 ngày)', 'processed_articles',
+         build_processed_query(sector='Other', days=30), [('processed_at', DESCENDING)], 1000),
+        ('Lọc sentiment Tích cực (7 ngày)', 'processed_articles',
+         build_processed_query(days=7, sentiment='Tích cực'), [('processed_at', DESCENDING)], 1000),
+        ('Bảng tin tức (20 bài mới nhất)', 'processed_articles',
+         build_processed_query(days=30), [('processed_at', DESCENDING)], 20),
+        ('fix_missing_sentiment: predicted_sentiment null', 'processed_articles',
+         {'$or': [{'predicted_sentiment': {'$exists': False}}, {'predicted_sentiment': None}]}, None, None),
+        ('load_news_data', 'news_articles', {}, [('created_at', DESCENDING)], 1000)
+    ]
+
+def _plan_stages(plan):
+    """Chuỗi stage của winningPlan, vd. LIMIT <- FETCH <- IXSCAN(processed_at_desc)"""
+    stages = []
+    while plan:
+        stage = plan.get('stage', '?')
+        if plan.get('indexName'):
+            stage = f"{stage}({plan['indexName']})"
+        stages.append(stage)
+        if 'inputStage' in plan:
+            plan = plan['inputStage']
+        elif plan.get('inputStages'):
+            stages.append('[' + ', '.join(' <- '.join(_plan_stages(p)) for p in plan['inputStages']) + ']')
+            break
+        else:
+            plan = None
+    return stages
+
+def explain_dashboard_queries(db):
+    """In execution plan của các query trong dashboard_queries()"""
+    if db is None:
+        print("❌ Không thể kết nối database!")
+        return
+
+    for label, collection_name, query, sort, limit in dashboard_queries():
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        explain = cursor.explain()
+        planner = explain.get('queryPlanner', {})
+        winning = planner.get('winningPlan', {})
+        # MongoDB 7+ bọc plan trong queryPlan khi dùng slot-based engine
+        winning = winning.get('queryPlan', winning)
+        stats = explain.get('executionStats', {})
+
+        stages = _plan_stages(winning)
+        print(f"\n🔎 {label} [{collection_name}]")
+        print(f"   Plan: {' <- '.join(stages)}")
+        if stats:
+            print(f"   Returned: {stats.get('nReturned', 0):,} | "
+                  f"Keys examined: {stats.get('totalKeysExamined', 0):,} | "
+                  f"Docs examined: {stats.get('totalDocsExamined', 0):,} | "
+                  f"Time: {stats.get('executionTimeMillis', 0)} ms")
+        if any(stage.startswith('COLLSCAN') for stage in stages):
+            print("   ⚠️  Full collection scan!")
@@ -0,0 +1,160 @@
+"""
+Schema document processed_articles
+
+Version 2:
+    sectors          mảng mã ngành chuẩn (VALID_SECTORS), ngành chính đứng đầu
+    sector           ngành chính (= sectors[0]), dùng cho filter/index của dashboard
+    predicted_label  nhãn sentiment duy nhất (0/1/2), bỏ predicted_sentiment dạng chuỗi
+    content_length   độ dài content gốc; content tách sang collection article_contents
+                     theo article_key, document chỉ giữ summary
+    schema_version   2
+
+Mọi collection bài viết (news_articles, processed_articles):
+    crawl_time       BSON date theo UTC (chuẩn hóa khi ghi, xem normalize_crawl_time)
+    crawl_day        ngày crawl theo DATABASE_CONFIG['timezone'], số ngày kể từ 1970-01-01
+                     (timeline gom bài theo ngày/tuần bằng trường này)
+
+Document cũ (không có schema_version) vẫn đọc được qua decode_processed_frame.
+"""
+import numbers
+from datetime import datetime
+
+import pandas as pd
+
+from config.settings import SECTOR_MAPPINGS, SENTIMENT_LABELS
+from src.utils.helpers import VALID_SECTORS, normalize_sector_series, to_utc, utc_now, day_bucket
+
+SCHEMA_VERSION = 2
+
+# Collection chứa content đầy đủ của processed_articles
+CONTENT_COLLECTION = 'article_contents'
+
+# Độ dài summary tạo từ content khi bài không có summary
+SUMMARY_CHARS = 500
+
+# Tên sentiment (tiếng Anh/tiếng Việt) -> nhãn số
+SENTIMENT_CODES = {
+    'Negative': 0,
+    'Neutral': 1,
+    'Positive': 2,
+    **{name: label for label, name in SENTIMENT_LABELS.items()}
+}
+
+# Tên sentiment (tiếng Anh/tiếng Việt) -> tiếng Việt
+SENTIMENT_NAME_MAP = {name: SENTIMENT_LABELS[label] for name, label in SENTIMENT_CODES.items()}
+
+def sector_codes(value):
+    """Danh sách mã ngành từ chuỗi phân tách bằng dấu phẩy hoặc list, giữ thứ tự, không trùng"""
+    if isinstance(value, str):
+        raw_values = value.split(',')
+    elif isinstance(value, (list, tuple)):
+        raw_values = value
+    else:
+        raw_values = []
+
+    codes = []
+    for raw in raw_values:
+        if not isinstance(raw, str):
+            continue
+        code = SECTOR_MAPPINGS.get(raw.strip(), raw.strip())
+        if code in VALID_SECTORS and code not in codes:
+            codes.append(code)
+    return codes or ['Other']
+
+def sentiment_code(record):
+    """Nhãn sentiment số của record (giống dashboard: predicted_sentiment trước, rồi predicted_label)"""
+    label = SENTIMENT_CODES.get(record.get('predicted_sentiment'))
+    if label is not None:
+        return label
+    label = record.get('predicted_label')
+    if label is not None and label == label and int(label) in SENTIMENT_LABELS:
+        return int(label)
+    return None
+
+def is_normalized_crawl_time(record):
+    """record đã qua normalize_crawl_time: crawl_day là số nguyên, crawl_time là datetime"""
+    crawl_day = record.get('crawl_day')
+    return (isinstance(crawl_day, numbers.Integral) and not isinstance(crawl_day, bool)
+            and isinstance(record.get('crawl_time'), datetime))
+
+def normalize_crawl_time(record, fallback=None):
+    """
+    crawl_time của record -> datetime UTC, thêm crawl_day (sửa trực tiếp record)
+
+    crawl_time có thể là datetime, Timestamp hoặc chuỗi (newspaper, Selenium,
+    phân tích URL). Thiếu hoặc không đọc được thì dùng fallback, rồi tới
+    thời điểm hiện tại. Record đã chuẩn hóa (có crawl_day, crawl_time là
+    datetime UTC đọc từ MongoDB) giữ nguyên, để chạy lại không dời giờ lần nữa.
+    """
+    if is_normalized_crawl_time(record):
+        return record
+
+    crawl_time = to_utc(record.get('crawl_time'))
+    if crawl_time is None:
+        crawl_time = to_utc(fallback) or to_utc(utc_now())
+    record['crawl_time'] = crawl_time
+    record['crawl_day'] = day_bucket(crawl_time)
+    return record
+
+def encode_processed(record):
+    """
+    Chuyển một record processed_articles (dạng cũ hoặc mới) sang schema v2
+
+    record cần có article_key trước khi gọi (khóa được tính từ content).
+    Returns: (document, content_document hoặc None)
+    """
+    doc = normalize_crawl_time(dict(record), fallback=record.get('processed_at'))
+
+    sectors = sector_codes(doc.get('sectors'))
+    doc['sectors'] = sectors
+    doc['sector'] = sectors[0]
+
+    label = sentiment_code(doc)
+    doc.pop('predicted_sentiment', None)
+    if label is not None:
+        doc['predicted_label'] = label
+
+    content = doc.pop('content', None)
+    content_doc = None
+    if isinstance(content, str) and content:
+        doc['content_length'] = len(content)
+        if not isinstance(doc.get('summary'), str) or not doc['summary']:
+            doc['summary'] = content[:SUMMARY_CHARS]
+        if doc.get('article_key'):
+            content_doc = {'article_key': doc['article_key'], 'content': content}
+
+    doc['schema_version'] = SCHEMA_VERSION
+    return doc, content_doc
+
+def decode_processed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Thêm cột hiển thị cho frame processed_articles (document cũ và v2)
+
+    sector (categorical VALID_SECTORS, sectors giữ cùng giá trị cho code cũ)
+    -> ngành chính, predicted_sentiment -> tên tiếng Việt. Document v2 lấy
+    trực tiếp sector/predicted_label; dòng cũ lấy từ sectors, chuẩn hóa theo
+    từng giá trị khác nhau chứ không theo từng dòng.
+    """
+    if df.empty:
+        return df
+
+    # Ngành chính
+    if 'sector' in df.columns:
+        sector = df['sector']
+    else:
+        sector = pd.Series(index=df.index, dtype=object)
+    if 'sectors' in df.columns:
+        sector = sector.where(sector.notna(), df['sectors'])
+    df['sector'] = normalize_sector_series(sector)
+    df['sectors'] = df['sector']
+
+    # Tên sentiment tiếng Việt (v2 không còn predicted_sentiment, lấy theo predicted_label)
+    if 'predicted_sentiment' in df.columns:
+        sentiment = df['predicted_sentiment'].map(SENTIMENT_NAME_MAP)
+    else:
+        sentiment = pd.Series(index=df.index, dtype=object)
+    if 'predicted_label' in df.columns:
+        sentiment = sentiment.fillna(df['predicted_label'].map(SENTIMENT_LABELS))
+    df['predicted_sentiment'] = sentiment.fillna(SENTIMENT_LABELS[1])
+
+    return df
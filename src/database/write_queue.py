@@ -0,0 +1,213 @@
+"""
+Write-behind queue: gom các thao tác ghi thành bulk write chạy ở thread nền
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List
+
+from config.settings import WRITE_QUEUE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Các collection được ghi qua write-behind queue
+WRITABLE_COLLECTIONS = ('news_articles', 'processed_articles', 'predictions')
+
+class _FlushMarker:
+    """Đánh dấu trong queue: ghi ngay batch hiện tại rồi báo cho bên gọi flush()"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+class WriteBehindQueue:
+    """
+    Queue ghi bất đồng bộ cho DatabaseManager
+
+    Bản ghi được gom theo collection và ghi khi đủ flush_size hoặc sau
+    flush_interval giây. Khi queue đầy, enqueue chờ tối đa put_timeout rồi
+    ghi đồng bộ (backpressure, không làm mất dữ liệu).
+    """
+
+    def __init__(self, db_manager=None, max_size: int = None, flush_size: int = None,
+                 flush_interval: float = None, put_timeout: float = None):
+        self._db_manager = db_manager
+        self.max_size = max_size or WRITE_QUEUE_CONFIG['max_size']
+        self.flush_size = flush_size or WRITE_QUEUE_CONFIG['flush_size']
+        self.flush_interval = flush_interval or WRITE_QUEUE_CONFIG['flush_interval']
+        self.put_timeout = put_timeout or WRITE_QUEUE_CONFIG['put_timeout']
+
+        self._queue = queue.Queue(maxsize=self.max_size)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stopping = False
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            'enqueued': 0,
+            'written': 0,
+            'failed': 0,
+            'sync_fallbacks': 0,
+            'flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0
+        }
+
+    @property
+    def db_manager(self):
+        # Khởi tạo lazy để import module không mở kết nối database
+        if self._db_manager is None:
+            from src.database.db_manager import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
+
+    def _writers(self):
+        return {
+            'news_articles': self.db_manager.save_news_data,
+            'processed_articles': self.db_manager.save_processed_data,
+            'predictions': self.db_manager.save_predictions
+        }
+
+    def _ensure_started(self):
+        """Start thread flush (khởi động lại trong process con sau khi fork)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                # Queue của process cha không dùng được sau fork
+                self._queue = queue.Queue(maxsize=self.max_size)
+            self._pid = os.getpid()
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name='write-behind-flusher', daemon=True)
+            self._thread.start()
+
+    def enqueue(self, collection_name: str, record: Dict[str, Any]) -> bool:
+        """Đưa một bản ghi vào queue (bản sao, bên gọi có thể tiếp tục dùng dict gốc)"""
+        return self.enqueue_many(collection_name, [record])
+
+    def enqueue_many(self, collection_name: str, records: List[Dict[str, Any]]) -> bool:
+        """
+        Đưa nhiều bản ghi vào queue, ghi đồng bộ nếu queue đầy quá put_timeout
+
+        Chỉ chờ put_timeout một lần cho cả batch: sau lần queue.Full đầu tiên
+        các bản ghi còn lại được ghi đồng bộ luôn.
+        """
+        if collection_name not in WRITABLE_COLLECTIONS:
+            raise ValueError(f"Collection không hỗ trợ write-behind: {collection_name}")
+
+        self._ensure_started()
+        overflow = []
+        for record in records:
+            if overflow:
+                overflow.append(dict(record))
+                continue
+            try:
+                self._queue.put((collection_name, dict(record)), timeout=self.put_timeout)
+            except queue.Full:
+                overflow.append(dict(record))
+
+        with self._metrics_lock:
+            self._metrics['enqueued'] += len(records) - len(overflow)
+
+        if overflow:
+            logger.warning(f"Write queue full, writing {len(overflow)} records synchronously")
+            with self._metrics_lock:
+                self._metrics['sync_fallbacks'] += len(overflow)
+            return self._write({collection_name: overflow})
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """Chờ tới khi mọi bản ghi đã enqueue trước đó được ghi xong"""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.empty()
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        return marker.done.wait(timeout)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Flush phần còn lại rồi dừng thread (gọi khi shutdown)"""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self.flush(timeout)
+        self._stopping = True
+        self._queue.put(_FlushMarker())
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            batch = {}
+            markers = []
+            count = 0
+
+            # Chờ bản ghi đầu tiên, sau đó gom tiếp tới flush_size hoặc hết flush_interval
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if isinstance(item, _FlushMarker):
+                    markers.append(item)
+                    break
+
+                collection_name, record = item
+                batch.setdefault(collection_name, []).append(record)
+                count += 1
+                if count >= self.flush_size:
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write(batch)
+            for marker in markers:
+                marker.done.set()
+            if self._stopping and self._queue.empty():
+                return
+
+    def _write(self, batch: Dict[str, List[Dict[str, Any]]]) -> bool:
+        """Ghi một batch đã gom theo collection, cập nhật metrics"""
+        start = time.perf_counter()
+        success = True
+        writers = self._writers()
+
+        for collection_name, records in batch.items():
+            try:
+                ok = writers[collection_name](records)
+            except Exception as e:
+                logger.error(f"Write-behind flush failed for {collection_name}: {e}")
+                ok = False
+            success = success and ok
+            with self._metrics_lock:
+                self._metrics['written' if ok else 'failed'] += len(records)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._metrics_lock:
+            self._metrics['flushes'] += 1
+            self._metrics['last_flush_ms'] = elapsed_ms
+            self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], elapsed_ms)
+            self._metrics['total_flush_ms'] += elapsed_ms
+        return success
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Độ sâu queue, số bản ghi đã ghi/lỗi và độ trễ flush"""
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+        flushes = metrics.pop('total_flush_ms')
+        metrics['avg_flush_ms'] = flushes / metrics['flushes'] if metrics['flushes'] else 0.0
+        metrics['queue_depth'] = self._queue.qsize()
+        metrics['running'] = self._thread is not None and self._thread.is_alive()
+        return metrics
+
+# Global write queue
+write_queue = WriteBehindQueue()
+atexit.register(write_queue.stop)
@@ -3,10 +3,14 @@ Phân tích sentiment cho văn bản tiếng Việt
 """
 import numpy as np
 from config.settings import SENTIMENT_LABELS
+from src.utils.helpers import generate_hash
 
 class SentimentAnalyzer:
     """Phân tích sentiment dựa trên từ khóa"""
     
+    # Tăng khi đổi cách tính điểm (kết quả đã cache của version cũ bị bỏ)
+    VERSION = 1
+    
     def __init__(self):
         self.positive_keywords = [
             'tăng', 'tăng trưởng', 'lợi nhuận', 'thành công', 'phát triển',
@@ -25,6 +29,12 @@ class SentimentAnalyzer:
             'trung bình', 'vừa phải'
         ]
     
+    @property
+    def version(self):
+        """Phiên bản kết quả: VERSION + dấu vân tay bộ từ khóa (đổi từ khóa cũng đổi version)"""
+        lexicon = (self.positive_keywords, self.negative_keywords, self.neutral_keywords)
+        return f"{self.VERSION}-{generate_hash(repr(lexicon))[:8]}"
+    
     def analyze(self, text):
         """
         Phân tích sentiment
@@ -5,12 +5,16 @@ import string
 from underthesea import word_tokenize, pos_tag, ner
 from pyvi import ViTokenizer
 import numpy as np
+from src.utils.helpers import generate_hash
 
 class VietnameseTextPreprocessor:
     """
     Xử lý văn bản tiếng Việt cho phân tích tài chính
     """
     
+    # Tăng khi đổi pipeline (kết quả đã cache của version cũ bị bỏ)
+    VERSION = 1
+    
     def __init__(self):
         # Từ điển từ vựng tài chính
         self.financial_terms = {
@@ -118,6 +122,12 @@ class VietnameseTextPreprocessor:
             'theo', 'từ', 'này', 'đó', 'các', 'những', 'một', 'để'
         ])
     
+    @property
+    def version(self):
+        """Phiên bản kết quả: VERSION + dấu vân tay từ điển ngành/từ khóa/stopwords"""
+        lexicon = (self.financial_terms, self.sectors, sorted(self.stopwords))
+        return f"{self.VERSION}-{generate_hash(repr(lexicon))[:8]}"
+    
     def clean_text(self, text):
         """Làm sạch văn bản"""
         if not isinstance(text, str):
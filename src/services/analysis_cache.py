@@ -0,0 +1,127 @@
+"""
+Cache kết quả preprocess/sentiment theo hash nội dung
+
+Cùng một văn bản (crawl lại bài cũ, phân tích lại URL) chỉ phải xử lý NLP
+một lần. Key = (loại kết quả, version của preprocessor/analyzer, hash văn
+bản), nên khi đổi từ điển hoặc tăng VERSION thì kết quả cũ tự không còn
+được dùng.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from config.settings import ANALYSIS_CACHE_CONFIG
+from src.services.cache_backends import EntryTooLarge, MemoryBackend
+from src.services.cache_service import register_memory_report
+from src.utils.helpers import generate_hash
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """
+    LRU trong process, phía sau là một file SQLite dùng chung giữa các
+    process trên cùng máy (crawler script, dashboard worker)
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None, enabled: bool = None):
+        self.path = path or ANALYSIS_CACHE_CONFIG['path']
+        self.enabled = ANALYSIS_CACHE_CONFIG['enabled'] if enabled is None else enabled
+        self.memory = MemoryBackend(
+            max_entries=max_entries or ANALYSIS_CACHE_CONFIG['max_entries'],
+            max_bytes=ANALYSIS_CACHE_CONFIG['max_bytes']
+        )
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        # (kind, version) đã dọn kết quả của version cũ trong process này
+        self._purged = set()
+
+    def preprocess(self, preprocessor, text: str) -> Dict[str, Any]:
+        """preprocessor.preprocess_pipeline(text), có cache"""
+        return self.get_or_compute('preprocess', preprocessor.version, text,
+                                   lambda: preprocessor.preprocess_pipeline(text))
+
+    def sentiment(self, analyzer, text: str) -> Dict[str, Any]:
+        """analyzer.analyze(text), có cache"""
+        return self.get_or_compute('sentiment', analyzer.version, text,
+                                   lambda: analyzer.analyze(text))
+
+    def get_or_compute(self, kind: str, version: str, text: str, compute: Callable[[], Dict[str, Any]]):
+        """Kết quả đã lưu cho (kind, version, text), nếu chưa có thì compute() và lưu lại"""
+        if not self.enabled:
+            return compute()
+
+        key = f"{kind}:{version}:{generate_hash(text)}"
+        value, _ = self.memory.get(key)
+        if value is not None:
+            return value
+
+        value = self._load(kind, version, key)
+        if value is None:
+            value = compute()
+            self._store(kind, version, key, value)
+        try:
+            self.memory.set(key, value, float('inf'))
+        except EntryTooLarge:
+            pass
+        return value
+
+    def report(self) -> Dict[str, Any]:
+        """Số entry và bytes của LRU trong bộ nhớ (cho trang debug)"""
+        return {'entries': len(self.memory), 'bytes': self.memory.nbytes, 'max_bytes': self.memory.max_bytes}
+
+    def _connection(self):
+        """Connection SQLite của process hiện tại (mở lại sau fork)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, kind TEXT, version TEXT, value TEXT, created_at REAL)'
+            )
+            self._conn = conn
+            self._conn_pid = os.getpid()
+            self._purged = set()
+        return self._conn
+
+    def _purge_stale(self, conn, kind: str, version: str) -> None:
+        """Xóa kết quả của các version khác (một lần cho mỗi kind/version)"""
+        if (kind, version) in self._purged:
+            return
+        deleted = conn.execute('DELETE FROM results WHERE kind = ? AND version != ?', (kind, version)).rowcount
+        conn.commit()
+        if deleted:
+            logger.info(f"Analysis cache: removed {deleted} {kind} results of old versions")
+        self._purged.add((kind, version))
+
+    def _load(self, kind: str, version: str, key: str):
+        try:
+            with self._lock:
+                conn = self._connection()
+                self._purge_stale(conn, kind, version)
+                row = conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Analysis cache read failed: {e}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _store(self, kind: str, version: str, key: str, value: Dict[str, Any]) -> None:
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    'INSERT OR REPLACE INTO results (key, kind, version, value, created_at) VALUES (?, ?, ?, ?, ?)',
+                    (key, kind, version, json.dumps(value, ensure_ascii=False), time.time())
+                )
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Analysis cache write failed: {e}")
+
+# Global instance
+analysis_cache = AnalysisCache()
+register_memory_report('analysis_cache', analysis_cache.report)
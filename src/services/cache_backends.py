@@ -0,0 +1,318 @@
+"""
+Backend lưu trữ cho CacheService
+
+MemoryBackend: dict LRU trong process (mặc định).
+FileBackend: thư mục dùng chung giữa các gunicorn worker trên cùng máy,
+mỗi entry là một file nhị phân (DataFrame dạng parquet nếu có pyarrow).
+"""
+from collections import OrderedDict
+import hashlib
+import importlib.util
+import io
+import logging
+import os
+import pickle
+import struct
+import sys
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# pandas tự import pyarrow khi ghi/đọc parquet, ở đây chỉ cần biết có cài hay không
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# Định dạng payload
+_FORMAT_PICKLE = b'P'
+_FORMAT_PARQUET = b'Q'
+
+# Header file cache: thời điểm hết hạn (epoch seconds), định dạng payload,
+# độ dài key; sau header là key (utf-8) rồi payload
+_HEADER = struct.Struct('>dcH')
+
+class EntryTooLarge(Exception):
+    """Entry lớn hơn toàn bộ ngân sách bytes của backend, không được lưu"""
+
+def sizeof(value: Any) -> int:
+    """
+    Ước lượng số bytes value chiếm trong bộ nhớ
+
+    DataFrame/Series dùng memory_usage(deep=True) (tính cả chuỗi trong cột
+    object); dict/list/tuple cộng dồn các phần tử.
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+def serialize(value: Any) -> bytes:
+    """Chuyển value sang bytes, DataFrame dùng parquet khi có pyarrow"""
+    if HAS_PYARROW and isinstance(value, pd.DataFrame):
+        try:
+            buffer = io.BytesIO()
+            value.to_parquet(buffer, index=True)
+            return _FORMAT_PARQUET + buffer.getvalue()
+        except Exception as e:
+            # Cột kiểu object hỗn hợp không ghi được parquet
+            logger.debug("Parquet serialization failed, using pickle: %s", e)
+    return _FORMAT_PICKLE + pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+def deserialize(data: bytes) -> Any:
+    """Ngược lại của serialize"""
+    fmt, payload = data[:1], data[1:]
+    if fmt == _FORMAT_PARQUET:
+        return pd.read_parquet(io.BytesIO(payload))
+    return pickle.loads(payload)
+
+class CacheBackend:
+    """Giao diện backend: lưu (value, expires_at) theo key, tự xử lý giới hạn số entry/bytes"""
+
+    # Backend dùng chung giữa các process hay không
+    shared = False
+
+    def get(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        """(value, expires_at) hoặc (None, None) nếu không có"""
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, expires_at: float) -> int:
+        """Lưu entry, trả về số entry bị loại để nhường chỗ (EntryTooLarge nếu vượt ngân sách)"""
+        raise NotImplementedError
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Các entry hiện có: key, bytes, expires_at (cho trang debug)"""
+        raise NotImplementedError
+
+    @property
+    def nbytes(self) -> int:
+        """Tổng bytes của các entry"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+class MemoryBackend(CacheBackend):
+    """
+    OrderedDict LRU trong process
+
+    Kích thước mỗi entry được đo bằng sizer khi lưu. Khi vượt max_entries
+    hoặc max_bytes, entry ít được dùng gần đây nhất bị loại cho tới khi đủ
+    chỗ.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None,
+                 sizer: Callable[[Any], int] = sizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        # key -> (value, expires_at, bytes)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+            return entry[0], entry[1]
+
+    def set(self, key, value, expires_at):
+        size = self.sizer(value)
+        evicted = 0
+        with self._lock:
+            self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                raise EntryTooLarge(f"{size} bytes > max_bytes {self.max_bytes}")
+
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and self._bytes > self.max_bytes):
+                _, (_, _, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                evicted += 1
+        return evicted
+
+    def _remove(self, key) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= entry[2]
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def describe(self):
+        with self._lock:
+            return [
+                {'key': key, 'bytes': size, 'expires_at': expires_at}
+                for key, (_, expires_at, size) in self._entries.items()
+            ]
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._entries)
+
+class FileBackend(CacheBackend):
+    """
+    Mỗi entry là một file trong directory, dùng chung giữa các process
+
+    Ghi qua file tạm + os.replace nên process khác không đọc phải file ghi
+    dở. Thứ tự LRU theo mtime (được cập nhật khi đọc trúng). Ngân sách
+    max_bytes tính theo kích thước file trên đĩa.
+    """
+
+    shared = True
+
+    def __init__(self, directory: str, max_entries: int = 256, max_bytes: Optional[int] = None):
+        self.directory = str(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{name}.cache")
+
+    def _entry_files(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith('.cache')]
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None, None
+
+        try:
+            expires_at, fmt, key_length = _HEADER.unpack_from(data)
+            value = deserialize(fmt + data[_HEADER.size + key_length:])
+        except Exception as e:
+            logger.warning(f"Corrupted cache file {path}: {e}")
+            self.delete(key)
+            return None, None
+
+        # Đánh dấu vừa dùng cho LRU
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value, expires_at
+
+    def set(self, key, value, expires_at):
+        data = serialize(value)
+        encoded_key = key.encode('utf-8')
+        size = _HEADER.size + len(encoded_key) + len(data) - 1
+        if self.max_bytes is not None and size > self.max_bytes:
+            self.delete(key)
+            raise EntryTooLarge(f"{size} bytes > max_bytes {self.max_bytes}")
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(expires_at, data[:1], len(encoded_key)))
+                f.write(encoded_key)
+                f.write(data[1:])
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self._evict()
+
+    def _stat_files(self):
+        """(entry, stat) của các file cache còn tồn tại"""
+        stats = []
+        for entry in self._entry_files():
+            try:
+                stats.append((entry, entry.stat()))
+            except FileNotFoundError:
+                pass
+        return stats
+
+    def _evict(self) -> int:
+        """Xóa các file dùng lâu nhất khi vượt max_entries hoặc max_bytes"""
+        files = sorted(self._stat_files(), key=lambda item: item[1].st_mtime)
+        count = len(files)
+        total = sum(stat.st_size for _, stat in files)
+
+        evicted = 0
+        for entry, stat in files:
+            if count <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            try:
+                os.remove(entry.path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            count -= 1
+            total -= stat.st_size
+        return evicted
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def clear(self):
+        for entry in self._entry_files():
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def describe(self):
+        entries = []
+        for entry, stat in sorted(self._stat_files(), key=lambda item: item[1].st_mtime):
+            try:
+                with open(entry.path, 'rb') as f:
+                    header = f.read(_HEADER.size)
+                    expires_at, _, key_length = _HEADER.unpack(header)
+                    key = f.read(key_length).decode('utf-8')
+            except (OSError, struct.error, UnicodeDecodeError):
+                continue
+            entries.append({'key': key, 'bytes': stat.st_size, 'expires_at': expires_at})
+        return entries
+
+    @property
+    def nbytes(self):
+        return sum(stat.st_size for _, stat in self._stat_files())
+
+    def __len__(self):
+        return len(self._entry_files())
+
+def create_backend(name: str, max_entries: int, directory: str = None, max_bytes: Optional[int] = None) -> CacheBackend:
+    """Tạo backend theo tên cấu hình ('memory' hoặc 'file')"""
+    if name == 'file':
+        return FileBackend(directory, max_entries=max_entries, max_bytes=max_bytes)
+    if name != 'memory':
+        logger.warning(f"Unknown cache backend '{name}', using memory")
+    return MemoryBackend(max_entries=max_entries, max_bytes=max_bytes)
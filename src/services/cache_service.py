@@ -1,45 +1,252 @@
 """
 Cache service để tối ưu hiệu suất dashboard
 """
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
 import time
-from typing import Any, Optional
-import pandas as pd
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import PERFORMANCE_CONFIG
+from src.services.cache_backends import CacheBackend, EntryTooLarge, MemoryBackend, create_backend
+
+logger = logging.getLogger(__name__)
+
+# Thread pool chạy các lần làm mới nền (tạo lại trong process con sau fork)
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+# Báo cáo bộ nhớ hiển thị ở /debug/cache: tên -> hàm trả về dict
+_memory_reports: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_memory_report(name: str, report: Callable[[], Dict[str, Any]]) -> None:
+    """Đăng ký một nguồn dữ liệu lớn trong bộ nhớ (cache, frame) cho trang debug"""
+    _memory_reports[name] = report
+
+def memory_report() -> Dict[str, Any]:
+    """Báo cáo của mọi nguồn đã đăng ký"""
+    reports = {}
+    for name, report in _memory_reports.items():
+        try:
+            reports[name] = report()
+        except Exception as e:
+            reports[name] = {'error': str(e)}
+    return reports
+
+def submit_background(func: Callable, *args) -> None:
+    """Chạy func(*args) ở thread nền dùng chung cho các lần làm mới cache"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=PERFORMANCE_CONFIG['refresh_workers'],
+                thread_name_prefix='cache-refresh'
+            )
+            _executor_pid = os.getpid()
+        executor = _executor
+    executor.submit(func, *args)
+
+class _Flight:
+    """Một lần tính đang chạy cho một key, các caller khác chờ kết quả"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
 
 class CacheService:
-    """Service quản lý cache cho dashboard"""
-    
-    def __init__(self, default_timeout: int = 300):
-        self._cache = {}
+    """
+    Cache LRU + TTL dùng chung cho dashboard
+
+    Mỗi entry có TTL riêng, hết hạn được kiểm tra khi truy cập (O(1), không
+    quét toàn bộ cache). Khi vượt max_entries, entry ít được dùng gần đây
+    nhất bị loại; backend có max_bytes thì loại tiếp tới khi tổng kích thước
+    các entry nằm trong ngân sách. Dữ liệu nằm ở backend: MemoryBackend
+    (trong process) hoặc FileBackend (dùng chung giữa các gunicorn worker).
+    Bộ đếm hit/miss là của process hiện tại.
+    """
+
+    def __init__(self, default_timeout: int = 300, max_entries: int = 256, backend: CacheBackend = None,
+                 max_stale: float = 0):
+        self.backend = backend if backend is not None else MemoryBackend(max_entries=max_entries)
         self.default_timeout = default_timeout
-    
+        self.max_entries = max_entries
+        self.max_stale = max_stale
+        self._stats_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0, 'expirations': 0,
+                       'deduplicated': 0, 'stale_served': 0, 'background_refreshes': 0, 'rejected': 0}
+        self._inflight_lock = threading.Lock()
+        self._inflight: Dict[str, _Flight] = {}
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _lookup(self, key: str):
+        """
+        (trạng thái, value) với trạng thái 'fresh', 'stale' hoặc None, không cập nhật bộ đếm hit/miss
+
+        Entry quá TTL vẫn được giữ thêm max_stale giây để phục vụ
+        stale-while-revalidate, sau đó mới bị xóa.
+        """
+        data, expires_at = self.backend.get(key)
+        if expires_at is None:
+            return None, None
+
+        # Thời gian tuyệt đối để các process cùng hiểu hạn của entry
+        now = time.time()
+        if now < expires_at:
+            return 'fresh', data
+        if now < expires_at + self.max_stale:
+            return 'stale', data
+
+        # Xóa cache hết hạn
+        self.backend.delete(key)
+        self._count('expirations')
+        return None, None
+
     def get(self, key: str) -> Optional[Any]:
         """Lấy dữ liệu từ cache"""
-        if key in self._cache:
-            data, timestamp, timeout = self._cache[key]
-            if time.time() - timestamp < timeout:
-                return data
-            else:
-                # Xóa cache hết hạn
-                del self._cache[key]
+        state, data = self._lookup(key)
+        if state == 'fresh':
+            self._count('hits')
+            return data
+        self._count('misses')
         return None
-    
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], timeout: Optional[int] = None) -> Any:
+        """
+        Lấy từ cache, nếu không có thì gọi compute() và lưu kết quả (trừ None)
+
+        Single-flight: các caller cùng key trong lúc compute() đang chạy sẽ chờ
+        và nhận chung kết quả thay vì tự tính lại.
+        Stale-while-revalidate: entry quá TTL nhưng chưa quá max_stale được trả
+        về ngay, compute() chạy lại ở thread nền.
+        """
+        state, value = self._lookup(key)
+        if state == 'fresh':
+            self._count('hits')
+            return value
+        if state == 'stale':
+            self._count('stale_served')
+            self._start_flight(key, compute, timeout, background=True)
+            return value
+
+        flight, leader = self._start_flight(key, compute, timeout)
+        if not leader:
+            self._count('deduplicated')
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _start_flight(self, key, compute, timeout, background=False):
+        """
+        Nhận (hoặc tham gia) lần tính đang chạy cho key
+
+        Returns: (flight, leader). Leader chạy compute() ngay (hoặc ở thread
+        nền nếu background); nếu key đã có flight thì không chạy thêm.
+        """
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            if flight is not None:
+                return flight, False
+            flight = _Flight()
+            self._inflight[key] = flight
+
+        if background:
+            self._count('background_refreshes')
+            submit_background(self._run_flight, key, flight, compute, timeout)
+        else:
+            self._run_flight(key, flight, compute, timeout)
+        return flight, True
+
+    def _run_flight(self, key, flight, compute, timeout):
+        try:
+            # Lần tính trước có thể vừa xong giữa lúc kiểm tra cache và nhận flight
+            state, value = self._lookup(key)
+            if state == 'fresh':
+                self._count('hits')
+            else:
+                self._count('misses')
+                value = compute()
+                if value is not None:
+                    self.set(key, value, timeout)
+            flight.value = value
+        except Exception as e:
+            logger.error(f"Cache compute failed for {key}: {e}")
+            flight.error = e
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+            flight.done.set()
+
     def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
         """Lưu dữ liệu vào cache"""
         if timeout is None:
             timeout = self.default_timeout
-        
-        self._cache[key] = (value, time.time(), timeout)
-    
+
+        try:
+            evicted = self.backend.set(key, value, time.time() + timeout)
+        except EntryTooLarge as e:
+            logger.warning(f"Cache entry {key} not stored: {e}")
+            self._count('rejected')
+            return
+        except Exception as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+            return
+        self._count('sets')
+        if evicted:
+            self._count('evictions', evicted)
+
     def clear(self) -> None:
         """Xóa toàn bộ cache"""
-        self._cache.clear()
-    
+        self.backend.clear()
+
     def delete(self, key: str) -> bool:
         """Xóa một key khỏi cache"""
-        if key in self._cache:
-            del self._cache[key]
-            return True
-        return False
+        return self.backend.delete(key)
+
+    def __len__(self) -> int:
+        return len(self.backend)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Số entry và các bộ đếm hit/miss/eviction/deduplicated"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['entries'] = len(self.backend)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['max_entries'] = self.max_entries
+        stats['bytes'] = self.backend.nbytes
+        stats['max_bytes'] = getattr(self.backend, 'max_bytes', None)
+        stats['backend'] = type(self.backend).__name__
+        return stats
+
+    def report(self, limit: int = 50) -> Dict[str, Any]:
+        """Bộ đếm và các entry lớn nhất (key, bytes, số giây còn lại) cho trang debug"""
+        now = time.time()
+        entries = sorted(self.backend.describe(), key=lambda entry: entry['bytes'], reverse=True)
+        return {
+            'stats': self.get_stats(),
+            'largest': [
+                {'key': entry['key'], 'bytes': entry['bytes'], 'ttl': round(entry['expires_at'] - now, 1)}
+                for entry in entries[:limit]
+            ]
+        }
 
 # Global cache instance
-dashboard_cache = CacheService(default_timeout=300)  # 5 phút
\ No newline at end of file
+dashboard_cache = CacheService(
+    default_timeout=PERFORMANCE_CONFIG['cache_timeout'],  # 5 phút
+    max_entries=PERFORMANCE_CONFIG['cache_max_entries'],
+    max_stale=PERFORMANCE_CONFIG['cache_max_stale'],
+    backend=create_backend(
+        PERFORMANCE_CONFIG['cache_backend'],
+        max_entries=PERFORMANCE_CONFIG['cache_max_entries'],
+        directory=PERFORMANCE_CONFIG['cache_dir'],
+        max_bytes=PERFORMANCE_CONFIG['cache_max_bytes']
+    )
+)
+register_memory_report('dashboard_cache', dashboard_cache.report)
@@ -0,0 +1,181 @@
+"""
+Theo dõi thay đổi processed_articles để làm mới cache dashboard
+
+Dùng MongoDB change stream khi server hỗ trợ (replica set/sharded), nếu
+không thì polling theo processed_at (mongod standalone chạy local).
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from config.settings import CHANGE_WATCHER_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Các loại thay đổi gửi cho listener
+CHANGE_TYPES = ('inserted', 'updated', 'deleted')
+
+# operationType của change stream -> loại thay đổi
+_OPERATION_TYPES = {
+    'insert': 'inserted',
+    'update': 'updated',
+    'replace': 'updated',
+    'delete': 'deleted',
+    'drop': 'deleted',
+    'invalidate': 'deleted'
+}
+
+class ProcessedArticlesWatcher:
+    """
+    Thread nền theo dõi processed_articles và gọi các listener khi có thay đổi
+
+    Listener nhận dict {'inserted', 'updated', 'deleted'} là số thay đổi đã
+    gom trong khoảng debounce. Chế độ polling chỉ phát hiện được bài mới
+    (processed_at lớn hơn mốc đã thấy), không thấy update/delete.
+    """
+
+    def __init__(self, db_manager=None, mode: str = None, poll_interval: float = None, debounce: float = None):
+        self._db_manager = db_manager
+        self.mode = mode or CHANGE_WATCHER_CONFIG['mode']
+        self.poll_interval = poll_interval or CHANGE_WATCHER_CONFIG['poll_interval']
+        self.debounce = debounce if debounce is not None else CHANGE_WATCHER_CONFIG['debounce']
+
+        self._listeners: List[Callable[[Dict[str, int]], Any]] = []
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._resume_token = None
+        self.active_mode = None
+
+    @property
+    def db_manager(self):
+        # Khởi tạo lazy để import module không mở kết nối database
+        if self._db_manager is None:
+            from src.database.db_manager import DatabaseManager
+            self._db_manager = DatabaseManager()
+        return self._db_manager
+
+    def add_listener(self, listener: Callable[[Dict[str, int]], Any]) -> None:
+        """Đăng ký hàm được gọi sau mỗi nhóm thay đổi"""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """Start thread theo dõi (mỗi process một thread, khởi động lại sau fork)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop_event = threading.Event()
+            self._thread = threading.Thread(target=self._run, name='processed-articles-watcher', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Dừng thread theo dõi"""
+        self._stop_event.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout)
+
+    def _restart_after_fork(self) -> None:
+        """Process con (gunicorn --preload) không có thread của process cha"""
+        if self._thread is not None and not self._stop_event.is_set():
+            self._thread = None
+            self.start()
+
+    def _notify(self, changes: Dict[str, int]) -> None:
+        logger.debug("processed_articles changed: %s", changes)
+        for listener in self._listeners:
+            try:
+                listener(changes)
+            except Exception as e:
+                logger.error("Change listener %s failed: %s", getattr(listener, '__name__', listener), e)
+
+    def _run(self):
+        try:
+            self._watch()
+        except Exception as e:
+            logger.error("Change watcher dừng do lỗi: %s", e, exc_info=True)
+
+    def _watch(self):
+        collection = self.db_manager.config.get_collection('processed_articles')
+        if collection is None:
+            logger.warning("Không có kết nối database, bỏ qua change watcher")
+            return
+
+        if self.mode in ('auto', 'change_stream'):
+            try:
+                self.active_mode = 'change_stream'
+                self._watch_change_stream(collection)
+                return
+            except OperationFailure as e:
+                if self.mode == 'change_stream':
+                    logger.error("Change stream không khả dụng: %s", e)
+                    self.active_mode = None
+                    return
+                logger.info("Change stream không khả dụng (%s), chuyển sang polling processed_at", e.code)
+
+        self.active_mode = 'polling'
+        self._poll(collection)
+
+    def _watch_change_stream(self, collection):
+        """Đọc change stream, gom các sự kiện trong khoảng debounce rồi báo listener"""
+        while not self._stop_event.is_set():
+            try:
+                with collection.watch(resume_after=self._resume_token, max_await_time_ms=1000) as stream:
+                    changes = dict.fromkeys(CHANGE_TYPES, 0)
+                    first_change_at = None
+                    while not self._stop_event.is_set() and stream.alive:
+                        change = stream.try_next()
+                        if change is not None:
+                            self._resume_token = stream.resume_token
+                            change_type = _OPERATION_TYPES.get(change['operationType'])
+                            if change_type:
+                                changes[change_type] += 1
+                                first_change_at = first_change_at or time.monotonic()
+
+                        if first_change_at and (change is None or time.monotonic() - first_change_at >= self.debounce):
+                            self._notify(changes)
+                            changes = dict.fromkeys(CHANGE_TYPES, 0)
+                            first_change_at = None
+            except OperationFailure:
+                if self._resume_token is None:
+                    raise
+                # Resume token hết hạn (oplog đã xoay vòng): coi như mọi thứ đã đổi
+                self._resume_token = None
+                self._notify({'inserted': 0, 'updated': 0, 'deleted': 1})
+            except PyMongoError as e:
+                logger.warning("Change stream bị ngắt, thử lại: %s", e)
+                self._stop_event.wait(self.poll_interval)
+
+    def _latest_processed_at(self, collection):
+        latest = collection.find_one({'processed_at': {'$type': 'date'}}, {'processed_at': 1, '_id': 0},
+                                     sort=[('processed_at', -1)])
+        return latest['processed_at'] if latest else None
+
+    def _poll(self, collection):
+        """Polling processed_at lớn hơn mốc đã thấy (dùng index processed_at_desc)"""
+        try:
+            mark = self._latest_processed_at(collection)
+        except PyMongoError as e:
+            logger.warning("Polling processed_articles lỗi: %s", e)
+            mark = None
+
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                query = {'processed_at': {'$gt': mark}} if mark is not None else {'processed_at': {'$type': 'date'}}
+                inserted = collection.count_documents(query)
+                if inserted:
+                    mark = self._latest_processed_at(collection)
+                    self._notify({'inserted': inserted, 'updated': 0, 'deleted': 0})
+            except PyMongoError as e:
+                logger.warning("Polling processed_articles lỗi: %s", e)
+
+# Global watcher
+change_watcher = ProcessedArticlesWatcher()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=change_watcher._restart_after_fork)
@@ -0,0 +1,173 @@
+"""
+Thống kê dashboard tính bằng aggregation pipeline của MongoDB
+"""
+import hashlib
+import logging
+from typing import Any, Dict, List
+
+from src.database.db_manager import DatabaseManager, build_processed_query, SENTIMENT_ALIASES
+from src.services.cache_service import dashboard_cache
+from src.utils.helpers import normalize_sector
+from config.settings import SENTIMENT_LABELS, WARMUP_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Điểm sentiment theo nhãn (giống market sentiment index trên dashboard)
+LABEL_SCORES = {0: -1, 1: 0, 2: 1}
+
+def _first_sector_expr():
+    """Ngành chính: trường sector (schema v2) hoặc ngành đầu tiên trong chuỗi sectors"""
+    return {'$ifNull': ['$sector', {'$cond': [
+        {'$eq': [{'$type': '$sectors'}, 'string']},
+        {'$trim': {'input': {'$arrayElemAt': [{'$split': ['$sectors', ',']}, 0]}}},
+        ''
+    ]}]}
+
+def _sentiment_name(raw_name, label):
+    """Chuẩn hóa predicted_sentiment về tiếng Việt, fallback theo predicted_label"""
+    if raw_name in SENTIMENT_ALIASES:
+        return SENTIMENT_LABELS[SENTIMENT_ALIASES[raw_name]]
+    if raw_name in SENTIMENT_LABELS.values():
+        return raw_name
+    if label in SENTIMENT_LABELS:
+        return SENTIMENT_LABELS[label]
+    return SENTIMENT_LABELS[1]
+
+class DashboardAggregates:
+    """
+    Tính số lượng/điểm trung bình theo sentiment và ngành
+
+    Một pipeline $match/$group cho mỗi khoảng thời gian trả về các bucket
+    (predicted_label, predicted_sentiment, ngành đầu tiên) -> số bài. Mọi tổ
+    hợp bộ lọc sector/sentiment được suy ra từ các bucket nhỏ này mà không
+    cần tải document nào về.
+    """
+
+    def __init__(self, db_manager: DatabaseManager = None, cache_timeout: int = 60):
+        self.db_manager = db_manager or DatabaseManager()
+        self.cache_timeout = cache_timeout
+        # Các khoảng thời gian đã tải trong process này (key cần xóa khi invalidate)
+        self._days = set()
+
+    @staticmethod
+    def _cache_key(days: int) -> str:
+        return f"aggregate_buckets_{days}"
+
+    def _pipeline(self, days: int) -> List[Dict[str, Any]]:
+        return [
+            # Range trên index crawl_time (crawl_time luôn là date UTC)
+            {'$match': build_processed_query(days=days)},
+            {'$group': {
+                '_id': {
+                    'label': '$predicted_label',
+                    'sentiment': '$predicted_sentiment',
+                    'sector': _first_sector_expr()
+                },
+                'count': {'$sum': 1}
+            }}
+        ]
+
+    def get_buckets(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Các bucket (label, sentiment, sector, count) đã chuẩn hóa, có cache (single-flight)"""
+        self._days.add(days)
+        buckets = dashboard_cache.get_or_compute(
+            self._cache_key(days),
+            lambda: self._load_buckets(days),
+            timeout=self.cache_timeout
+        )
+        return buckets or []
+
+    def _load_buckets(self, days: int):
+        """Chạy pipeline, None nếu lỗi (không cache kết quả lỗi)"""
+        collection = self.db_manager.config.get_collection('processed_articles')
+        if collection is None:
+            return None
+
+        buckets = []
+        try:
+            for row in collection.aggregate(self._pipeline(days)):
+                key = row['_id']
+                label = key.get('label')
+                buckets.append({
+                    'label': label if label in SENTIMENT_LABELS else None,
+                    'sentiment': _sentiment_name(key.get('sentiment'), label),
+                    'sector': normalize_sector(key.get('sector')),
+                    'count': row['count']
+                })
+        except Exception as e:
+            logger.error(f"Error aggregating dashboard stats: {e}")
+            return None
+        return buckets
+
+    def version(self, days: int = 30) -> str:
+        """Phiên bản dữ liệu của khoảng thời gian days: đổi khi các bucket thay đổi"""
+        buckets = sorted(
+            (str(bucket['label']), bucket['sentiment'], bucket['sector'], bucket['count'])
+            for bucket in self.get_buckets(days)
+        )
+        return hashlib.md5(repr(buckets).encode('utf-8')).hexdigest()
+
+    def invalidate(self) -> None:
+        """
+        Bỏ các bucket đã cache (gọi khi processed_articles thay đổi)
+
+        Chỉ xóa key aggregate_buckets_*, không đụng tới entry khác của
+        dashboard_cache (với CACHE_BACKEND=file là thư mục dùng chung giữa
+        các worker). Gồm các khoảng thời gian của time-filter, kể cả khi
+        process này chưa tải (process ghi dữ liệu không phải dashboard).
+        """
+        for days in self._days | set(WARMUP_CONFIG['days']):
+            dashboard_cache.delete(self._cache_key(days))
+
+    def summarize(self, sector: str = 'all', days: int = 30, sentiment_type: str = 'all') -> Dict[str, Any]:
+        """
+        Thống kê cho một tổ hợp bộ lọc
+
+        Returns: dict với total, by_label, by_sentiment, by_sector
+        ({ngành: {'count', 'score'}}) và market_index
+        """
+        sentiment_filter = SENTIMENT_LABELS.get(SENTIMENT_ALIASES.get(sentiment_type), sentiment_type)
+
+        by_label = {label: 0 for label in SENTIMENT_LABELS}
+        by_sentiment = {}
+        sector_counts = {}
+        sector_scores = {}
+        score_sum = 0
+        scored = 0
+        total = 0
+
+        for bucket in self.get_buckets(days):
+            if sector != 'all' and bucket['sector'] != sector:
+                continue
+            if sentiment_type != 'all' and bucket['sentiment'] != sentiment_filter:
+                continue
+
+            count = bucket['count']
+            label = bucket['label']
+            total += count
+            by_sentiment[bucket['sentiment']] = by_sentiment.get(bucket['sentiment'], 0) + count
+            sector_counts[bucket['sector']] = sector_counts.get(bucket['sector'], 0) + count
+
+            if label is not None:
+                by_label[label] += count
+                score_sum += LABEL_SCORES[label] * count
+                scored += count
+                sector_score = sector_scores.setdefault(bucket['sector'], [0, 0])
+                sector_score[0] += LABEL_SCORES[label] * count
+                sector_score[1] += count
+
+        by_sector = {
+            name: {
+                'count': count,
+                'score': sector_scores[name][0] / sector_scores[name][1] if name in sector_scores else 0.0
+            }
+            for name, count in sector_counts.items()
+        }
+
+        return {
+            'total': total,
+            'by_label': by_label,
+            'by_sentiment': by_sentiment,
+            'by_sector': by_sector,
+            'market_index': score_sum / scored if scored else 0.0
+        }
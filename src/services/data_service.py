@@ -4,13 +4,16 @@ Service layer để tách biệt logic xử lý dữ liệu khỏi UI
 from datetime import datetime, timedelta
 import pandas as pd
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence
 
 from src.database.db_manager import DatabaseManager
 from src.crawler.url_parser import URLParser
 from src.processing.text_preprocessor import VietnameseTextPreprocessor
 from src.processing.sentiment_analyzer import SentimentAnalyzer
 from src.services.cache_service import dashboard_cache
+from src.services.dashboard_aggregates import DashboardAggregates
+from src.services.url_memo import URLAnalysisMemo
+from src.utils.helpers import utc_now
 from config.settings import SENTIMENT_LABELS
 
 logger = logging.getLogger(__name__)
@@ -23,25 +26,26 @@ class DataService:
         self.url_parser = URLParser()
         self.preprocessor = VietnameseTextPreprocessor()
         self.sentiment_analyzer = SentimentAnalyzer()
+        self.url_memo = URLAnalysisMemo(self.db_manager, self.url_parser, self.preprocessor, self.sentiment_analyzer)
+        self.aggregates = DashboardAggregates(self.db_manager)
+        # Key dashboard_cache do service này tạo (xóa khi có dữ liệu mới)
+        self._cache_keys = set()
     
     def analyze_url(self, url: str) -> Dict[str, Any]:
         """Phân tích URL và trả về kết quả"""
         try:
-            # Parse URL
-            result = self.url_parser.parse_url(url)
+            # Parse + preprocess + sentiment (dùng kết quả đã lưu nếu URL đã được phân tích)
+            analysis = self.url_memo.analyze(url)
             
-            if not result['success']:
+            if not analysis['success']:
                 return {
                     'success': False,
-                    'error': result.get('error', 'Không thể trích xuất nội dung')
+                    'error': analysis.get('error', 'Không thể trích xuất nội dung')
                 }
             
-            # Preprocess
-            full_text = f"{result['title']} {result['content']}"
-            processed = self.preprocessor.preprocess_pipeline(full_text)
-            
-            # Analyze sentiment
-            sentiment = self.sentiment_analyzer.analyze(full_text)
+            result = analysis['result']
+            processed = analysis['processed']
+            sentiment = analysis['sentiment']
             sentiment_label = SENTIMENT_LABELS[sentiment['label']]
             
             return {
@@ -84,25 +88,24 @@ class DataService:
             save_data = {
                 'source': data['source'],
                 'title': data['title'],
-                'content': data['content'][:500],
+                'content': data['content'],
                 'link': data['link'],
-                'crawl_time': datetime.now(),
+                'crawl_time': utc_now(),
                 'cleaned_text': data['cleaned_text'],
                 'sentiment_positive': sentiment['scores']['positive'],
                 'sentiment_negative': sentiment['scores']['negative'],
                 'sentiment_neutral': sentiment['scores']['neutral'],
                 'predicted_label': sentiment['predicted_label'],
-                'predicted_sentiment': sentiment['label'],
-                'sectors': ','.join(data['sectors']) if data['sectors'] else 'Other',
+                'sectors': data['sectors'],
                 'processed_at': datetime.now()
             }
             
             df_save = pd.DataFrame([save_data])
             success = self.db_manager.save_processed_data(df_save)
             
-            # Xóa cache khi có dữ liệu mới
+            # Xóa cache liên quan khi có dữ liệu mới
             if success:
-                dashboard_cache.clear()
+                self.invalidate_cache()
             
             return success
             
@@ -110,9 +113,24 @@ class DataService:
             logger.error(f"Error saving analysis result: {str(e)}")
             return False
     
-    def get_dashboard_data(self, limit: int = 1000, use_cache: bool = True) -> pd.DataFrame:
-        """Lấy dữ liệu cho dashboard với cache"""
-        cache_key = f"dashboard_data_{limit}"
+    def invalidate_cache(self) -> None:
+        """Bỏ bucket aggregate và các entry của service này, không xóa toàn bộ dashboard_cache"""
+        self.aggregates.invalidate()
+        for key in list(self._cache_keys):
+            dashboard_cache.delete(key)
+        self._cache_keys.clear()
+    
+    def get_dashboard_data(self, limit: int = 1000, use_cache: bool = True, sector: str = 'all',
+                           days: Optional[int] = None, sentiment: str = 'all',
+                           fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Lấy dữ liệu cho dashboard với cache
+
+        Bộ lọc sector/days/sentiment và projection fields chạy ở MongoDB
+        (load_processed_data), chỉ các cột cần thiết được truyền về.
+        """
+        columns = ','.join(fields) if fields else 'all'
+        cache_key = f"dashboard_data_{limit}_{sector}_{days}_{sentiment}_{columns}"
         
         if use_cache:
             cached_data = dashboard_cache.get(cache_key)
@@ -120,19 +138,22 @@ class DataService:
                 return cached_data
         
         try:
-            df = self.db_manager.load_processed_data(limit=limit)
+            df = self.db_manager.load_processed_data(limit=limit, sector=sector, days=days,
+                                                     sentiment=sentiment, fields=fields)
             
             if use_cache and not df.empty:
                 dashboard_cache.set(cache_key, df, timeout=60)  # Cache 1 phút
+                self._cache_keys.add(cache_key)
             
             return df
         except Exception as e:
             logger.error(f"Error loading dashboard data: {str(e)}")
             return pd.DataFrame()
     
-    def get_stats(self, df: Optional[pd.DataFrame] = None, use_cache: bool = True) -> Dict[str, Any]:
-        """Tính toán thống kê từ DataFrame với cache"""
-        cache_key = "dashboard_stats"
+    def get_stats(self, df: Optional[pd.DataFrame] = None, use_cache: bool = True, sector: str = 'all',
+                  days: Optional[int] = None, sentiment: str = 'all') -> Dict[str, Any]:
+        """Tính toán thống kê từ DataFrame với cache (df None: chỉ tải predicted_label theo bộ lọc)"""
+        cache_key = f"dashboard_stats_{sector}_{days}_{sentiment}"
         
         if use_cache:
             cached_stats = dashboard_cache.get(cache_key)
@@ -140,7 +161,8 @@ class DataService:
                 return cached_stats
         
         if df is None:
-            df = self.get_dashboard_data(use_cache=use_cache)
+            df = self.get_dashboard_data(use_cache=use_cache, sector=sector, days=days, sentiment=sentiment,
+                                         fields=('predicted_label',))
         
         if df.empty:
             stats = {
@@ -164,5 +186,6 @@ class DataService:
         
         if use_cache:
             dashboard_cache.set(cache_key, stats, timeout=60)
+            self._cache_keys.add(cache_key)
         
         return stats
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Cache figure Plotly đã dựng cho các callback biểu đồ của dashboard
+"""
+import logging
+from typing import Any, Callable, Dict
+
+from config.settings import PERFORMANCE_CONFIG
+from src.services.cache_backends import MemoryBackend
+from src.services.cache_service import CacheService, register_memory_report
+
+logger = logging.getLogger(__name__)
+
+# Figure (dict đã serialize) theo (biểu đồ, bộ lọc, phiên bản dữ liệu).
+# Key đã chứa phiên bản dữ liệu nên TTL chỉ để giới hạn bộ nhớ; figure nhỏ
+# và rẻ khi dựng lại nên luôn giữ trong process.
+figure_cache = CacheService(
+    default_timeout=PERFORMANCE_CONFIG['cache_timeout'],
+    max_entries=PERFORMANCE_CONFIG['figure_cache_max_entries'],
+    backend=MemoryBackend(
+        max_entries=PERFORMANCE_CONFIG['figure_cache_max_entries'],
+        max_bytes=PERFORMANCE_CONFIG['figure_cache_max_bytes']
+    )
+)
+register_memory_report('figure_cache', figure_cache.report)
+
+def figure_key(chart_id: str, filters: tuple, version: str) -> str:
+    """Key của figure: cùng key nghĩa là cùng nội dung biểu đồ"""
+    return f"{chart_id}|{'|'.join(map(str, filters))}|{version}"
+
+def get_figure(key: str, build: Callable[[], Any]) -> Dict[str, Any]:
+    """Figure dict đã cache, dựng bằng build() (trả về go.Figure) nếu chưa có"""
+    return figure_cache.get_or_compute(key, lambda: build().to_dict())
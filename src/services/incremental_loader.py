@@ -0,0 +1,350 @@
+"""
+Frame processed_articles giữ trong process, chỉ tải thêm bài mới mỗi lần refresh
+"""
+from datetime import timedelta
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.database.db_manager import DatabaseManager, build_processed_query
+from src.database.schema import SENTIMENT_NAME_MAP, decode_processed_frame
+from src.services.cache_service import CacheService, dashboard_cache, submit_background
+from src.utils.helpers import local_now, sector_positions, utc_to_local
+from config.settings import PERFORMANCE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Các cột frame giữ lại (_id để loại bài đã có khi refresh)
+FRAME_FIELDS = ('_id', 'crawl_time', 'crawl_day', 'processed_at', 'updated_at', 'sector', 'sectors', 'predicted_label', 'predicted_sentiment',
+                'cleaned_text', 'title', 'content_length', 'summary', 'source', 'link',
+                'sentiment_positive')
+
+# Key trong cache dùng chung: token frame mới nhất đã lưu (frame nằm ở SHARED_FRAME_PREFIX + token)
+SHARED_FRAME_LATEST_KEY = 'processed_frame_latest'
+SHARED_FRAME_PREFIX = 'processed_frame_'
+
+# Không có dòng nào khớp
+_NO_ROWS = np.array([], dtype=np.intp)
+
+def normalize_processed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Chuẩn hóa một batch processed_articles cho dashboard
+
+    sectors về ngành chính, predicted_sentiment về tiếng Việt (xem
+    decode_processed_frame), crawl_time (UTC trong MongoDB) về giờ
+    DATABASE_CONFIG['timezone'], content_length (document chưa migrate: 0).
+    """
+    if df.empty:
+        return df
+
+    # BƯỚC 1: ngành chính và tên sentiment (document cũ và schema v2)
+    df = decode_processed_frame(df)
+
+    # BƯỚC 2: crawl_time đã là date UTC (chuẩn hóa khi ghi), chỉ đổi múi giờ
+    if 'crawl_time' in df.columns:
+        df['crawl_time'] = utc_to_local(df['crawl_time'])
+
+    # BƯỚC 3: content nằm ở article_contents (không tải về frame), chỉ giữ độ dài
+    if 'content_length' not in df.columns:
+        df['content_length'] = 0
+    df['content_length'] = df['content_length'].fillna(0).astype(int)
+
+    return df
+
+class IncrementalProcessedFrame:
+    """
+    DataFrame processed_articles đã chuẩn hóa, cập nhật theo high-water mark
+
+    Mỗi lần refresh chỉ query document có updated_at (document cũ chưa có
+    updated_at: processed_at) từ mốc cao nhất đã tải, lùi lại overlap giây để
+    không sót bài ghi trễ qua write queue. Bài mới được nối vào frame, bài đã
+    có thay bằng bản mới nhất, bài cũ hơn cửa sổ thời gian lớn nhất của
+    dashboard bị bỏ. Frame không bị sửa tại chỗ, mỗi lần refresh thay bằng
+    frame mới nên có thể đọc không cần lock.
+
+    Với cache dùng chung (CACHE_BACKEND=file), frame sau mỗi lần thay đổi
+    được lưu theo token; worker mới khởi động lấy frame đó rồi chỉ query
+    phần mới hơn high-water mark thay vì tải lại toàn bộ cửa sổ thời gian.
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None, window_days: Optional[int] = None,
+                 refresh_interval: Optional[float] = None, overlap_seconds: Optional[float] = None,
+                 shared_cache: Optional[CacheService] = None):
+        self.db_manager = db_manager or DatabaseManager()
+        if shared_cache is None and dashboard_cache.backend.shared:
+            shared_cache = dashboard_cache
+        self.shared_cache = shared_cache
+        self.window_days = window_days or PERFORMANCE_CONFIG['max_window_days']
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else PERFORMANCE_CONFIG['refresh_interval'])
+        self.overlap_seconds = (overlap_seconds if overlap_seconds is not None
+                                else PERFORMANCE_CONFIG['refresh_overlap_seconds'])
+        self.max_stale = PERFORMANCE_CONFIG['cache_max_stale']
+        self.max_bytes = PERFORMANCE_CONFIG['frame_max_bytes']
+        # Số bài đã bỏ vì vượt max_bytes (lần trim gần nhất)
+        self.trimmed = 0
+        # Số lần tải từ MongoDB và số caller chờ lần tải đang chạy thay vì tự tải lại
+        self.loads = 0
+        self.deduplicated = 0
+        # Số lần lấy frame từ cache dùng chung thay vì tải toàn bộ cửa sổ thời gian
+        self.shared_loads = 0
+
+        self._lock = threading.Lock()
+        self._frame = pd.DataFrame()
+        self._indexes = (self._frame, {}, {})
+        self._high_water_mark = None
+        self._last_refresh = None
+        self.version = 0
+
+    @property
+    def token(self) -> str:
+        """
+        Định danh dữ liệu của frame, giống nhau giữa các process đã tải cùng dữ liệu
+
+        version chỉ có nghĩa trong một process; key cache dùng chung giữa các
+        worker dùng high-water mark (updated_at lớn nhất, đổi cả khi bài được
+        cập nhật) và số dòng (đổi khi bài bị xóa rồi frame tải lại).
+        """
+        mark = self._high_water_mark.isoformat() if self._high_water_mark else 'none'
+        return f"{mark}_{len(self._frame)}"
+
+    def memory_report(self) -> Dict[str, Any]:
+        """Số dòng, bytes theo cột và bộ đếm loads/deduplicated của frame (cho trang debug)"""
+        frame = self._frame
+        usage = frame.memory_usage(deep=True, index=True)
+        return {
+            'rows': len(frame),
+            'bytes': int(usage.sum()),
+            'max_bytes': self.max_bytes,
+            'trimmed': self.trimmed,
+            'columns': {str(name): int(size) for name, size in usage.sort_values(ascending=False).items()},
+            'token': self.token,
+            'stats': {'loads': self.loads, 'deduplicated': self.deduplicated, 'shared_loads': self.shared_loads}
+        }
+
+    def reset(self) -> None:
+        """Bỏ frame hiện tại, lần get() sau sẽ tải lại toàn bộ cửa sổ thời gian"""
+        with self._lock:
+            # Frame đã lưu chung cũng có thể còn bài đã bị xóa
+            if self.shared_cache is not None:
+                self.shared_cache.delete(SHARED_FRAME_LATEST_KEY)
+            self._set_frame(pd.DataFrame())
+            self._high_water_mark = None
+            self._last_refresh = None
+            self.version += 1
+
+    def get(self, force_refresh: bool = False) -> pd.DataFrame:
+        """
+        Frame hiện tại (processed_at giảm dần, có cột _id)
+
+        Quá refresh_interval: trả frame hiện tại ngay và refresh ở thread nền
+        (stale-while-revalidate). Chỉ refresh đồng bộ khi chưa tải lần nào
+        hoặc frame đã cũ hơn refresh_interval + max_stale.
+        """
+        if force_refresh or self._last_refresh is None:
+            self.refresh(force=force_refresh)
+        elif not self._is_fresh():
+            age = time.monotonic() - self._last_refresh
+            if age >= self.refresh_interval + self.max_stale:
+                self.refresh()
+            elif not self._lock.locked():
+                submit_background(self.refresh)
+        return self._frame
+
+    def _set_frame(self, frame: pd.DataFrame) -> None:
+        """Thay frame và tính lại vị trí dòng theo ngành/sentiment (gán cùng lúc để select luôn nhất quán)"""
+        if frame.empty:
+            by_sector, by_sentiment = {}, {}
+        else:
+            by_sector = sector_positions(frame['sectors'])
+            by_sentiment = frame.groupby('predicted_sentiment', sort=False, observed=True).indices
+        self._indexes = (frame, by_sector, by_sentiment)
+        self._frame = frame
+
+    def select(self, sector: str = 'all', days: int = 30, sentiment: str = 'all', limit: int = None,
+               columns=None) -> pd.DataFrame:
+        """
+        Các bài mới nhất theo bộ lọc, lấy từ frame chung
+
+        Ngành/sentiment dùng vị trí dòng đã tính sẵn (không quét lại cột),
+        thời gian lọc bằng mask trên phần còn lại. columns: cột cần trả về
+        (None = mọi cột trừ _id).
+        """
+        frame, by_sector, by_sentiment = self._indexes
+        if frame.empty:
+            return frame
+
+        positions = None
+        if sector != 'all':
+            positions = by_sector.get(sector, _NO_ROWS)
+        if sentiment != 'all':
+            sentiment_positions = by_sentiment.get(SENTIMENT_NAME_MAP.get(sentiment, sentiment), _NO_ROWS)
+            positions = (sentiment_positions if positions is None
+                         else np.intersect1d(positions, sentiment_positions, assume_unique=True))
+
+        # Vị trí tăng dần nên giữ nguyên thứ tự processed_at giảm dần
+        view = frame if positions is None else frame.take(positions)
+        cutoff_date = local_now() - timedelta(days=days)
+        view = view[view['crawl_time'] >= cutoff_date]
+        if limit:
+            view = view.head(limit)
+
+        if columns is None:
+            columns = [col for col in view.columns if col != '_id']
+        else:
+            columns = [col for col in columns if col in view.columns]
+        return view[columns]
+
+    def _is_fresh(self) -> bool:
+        return self._last_refresh is not None and time.monotonic() - self._last_refresh < self.refresh_interval
+
+    def _query(self):
+        # Chỉ lấy bài trong cửa sổ thời gian lớn nhất
+        window_query = build_processed_query(days=self.window_days)
+        if self._high_water_mark is None:
+            return window_query
+
+        since = self._high_water_mark - timedelta(seconds=self.overlap_seconds)
+        changed = {'$or': [
+            {'updated_at': {'$gte': since}},
+            {'updated_at': {'$exists': False}, 'processed_at': {'$gte': since}}
+        ]}
+        return {'$and': [window_query, changed]}
+
+    def _adopt_shared(self) -> bool:
+        """Nhận frame mới nhất trong cache dùng chung (nếu có), trả về True nếu đã nhận"""
+        if self.shared_cache is None:
+            return False
+        latest = self.shared_cache.get(SHARED_FRAME_LATEST_KEY)
+        if not latest:
+            return False
+        frame = self.shared_cache.get(SHARED_FRAME_PREFIX + latest['token'])
+        if frame is None or frame.empty:
+            return False
+
+        self._set_frame(frame)
+        self._high_water_mark = latest['mark']
+        self.version += 1
+        self.shared_loads += 1
+        logger.info("Processed frame loaded from shared cache: %d rows (token %s)", len(frame), latest['token'])
+        return True
+
+    def _publish_shared(self) -> None:
+        """Lưu frame vào cache dùng chung theo token (bỏ qua nếu worker khác đã lưu token này)"""
+        if self.shared_cache is None or self._high_water_mark is None:
+            return
+        token = self.token
+        latest = self.shared_cache.get(SHARED_FRAME_LATEST_KEY)
+        if latest and latest['token'] == token:
+            return
+
+        self.shared_cache.set(SHARED_FRAME_PREFIX + token, self._frame)
+        self.shared_cache.set(SHARED_FRAME_LATEST_KEY, {'token': token, 'mark': self._high_water_mark})
+        if latest:
+            self.shared_cache.delete(SHARED_FRAME_PREFIX + latest['token'])
+
+    def _trim(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Giữ frame trong max_bytes: bỏ các bài crawl cũ nhất
+
+        Số dòng giữ lại ước lượng theo bytes trung bình mỗi dòng (lặp lại nếu
+        vẫn vượt). Time-filter dài nhất khi đó chỉ thấy phần mới nhất của cửa
+        sổ thời gian.
+        """
+        self.trimmed = 0
+        if not self.max_bytes:
+            return frame
+        rows = len(frame)
+        nbytes = int(frame.memory_usage(deep=True, index=True).sum())
+        if nbytes <= self.max_bytes:
+            return frame
+
+        original_bytes = nbytes
+        while nbytes > self.max_bytes and not frame.empty:
+            keep = min(len(frame) - 1, int(len(frame) * self.max_bytes / nbytes))
+            frame = frame.nlargest(keep, 'crawl_time').reset_index(drop=True)
+            nbytes = int(frame.memory_usage(deep=True, index=True).sum())
+
+        self.trimmed = rows - len(frame)
+        logger.warning("Processed frame %d bytes exceeds %d, dropped %d oldest articles",
+                       original_bytes, self.max_bytes, self.trimmed)
+        return frame
+
+    def refresh(self, force: bool = False) -> int:
+        """Tải các bài mới/được cập nhật kể từ lần refresh trước, trả về số bài đã nạp vào frame"""
+        if not force and self._is_fresh():
+            return 0
+
+        # Single-flight: đang có thread tải thì chờ và dùng luôn kết quả của nó
+        waited = self._lock.locked()
+        with self._lock:
+            # Thread khác có thể vừa refresh xong trong lúc chờ lock
+            if not force and self._is_fresh():
+                if waited:
+                    self.deduplicated += 1
+                return 0
+
+            # Worker mới: lấy frame worker khác đã tải, sau đó chỉ query phần mới hơn
+            if self._high_water_mark is None and self._frame.empty:
+                self._adopt_shared()
+
+            self.loads += 1
+            chunks = list(self.db_manager.iter_processed(query=self._query(), projection=FRAME_FIELDS, sort=False))
+            self._last_refresh = time.monotonic()
+            new_rows = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+            frame = self._frame
+            if not new_rows.empty:
+                for column in ('processed_at', 'updated_at'):
+                    if column not in new_rows.columns:
+                        new_rows[column] = pd.NaT
+                    new_rows[column] = pd.to_datetime(new_rows[column], errors='coerce')
+                # Thời điểm ghi gần nhất (document cũ chưa có updated_at)
+                new_rows['updated_at'] = new_rows['updated_at'].fillna(new_rows['processed_at'])
+
+                latest = new_rows['updated_at'].max()
+                if pd.notna(latest):
+                    latest = latest.to_pydatetime()
+                    if self._high_water_mark is None or latest > self._high_water_mark:
+                        self._high_water_mark = latest
+
+                # Bài trong khoảng overlap đã có trong frame và chưa đổi
+                if not frame.empty:
+                    loaded = frame.set_index('_id')['updated_at']
+                    new_rows = new_rows[new_rows['_id'].map(loaded) != new_rows['updated_at']]
+                new_rows = normalize_processed_frame(new_rows)
+
+            # Không có mốc khi chưa tải được bài nào (database trống hoặc lỗi
+            # kết nối): lần sau query lại toàn bộ cửa sổ thời gian
+            if not new_rows.empty:
+                if frame.empty:
+                    frame = new_rows
+                else:
+                    # Bài được cập nhật: giữ bản vừa tải
+                    frame = pd.concat([frame, new_rows], ignore_index=True).drop_duplicates('_id', keep='last')
+
+            # Bỏ các bài cũ hơn cửa sổ thời gian lớn nhất
+            evicted = 0
+            if not frame.empty and 'crawl_time' in frame.columns:
+                cutoff_date = local_now() - timedelta(days=self.window_days)
+                keep = frame['crawl_time'] >= cutoff_date
+                evicted = int((~keep).sum())
+                if evicted:
+                    frame = frame[keep]
+
+            if new_rows.empty and not evicted:
+                return 0
+
+            frame = self._trim(frame)
+
+            self._set_frame(frame.sort_values('processed_at', ascending=False, kind='stable').reset_index(drop=True))
+            self.version += 1
+            self._publish_shared()
+
+            logger.debug("Processed frame refreshed: +%d rows, -%d evicted, %d total",
+                         len(new_rows), evicted, len(self._frame))
+            return len(new_rows)
@@ -0,0 +1,96 @@
+"""
+Đếm số bài theo thời gian x sentiment cho biểu đồ timeline
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from config.settings import SENTIMENT_LABELS, TIMELINE_CONFIG
+from src.utils.helpers import DAY_EPOCH, local_now
+
+# Thứ tự các đường trên biểu đồ
+TIMELINE_SENTIMENTS = [SENTIMENT_LABELS[2], SENTIMENT_LABELS[1], SENTIMENT_LABELS[0]]
+
+# Độ dài bucket: giờ, ngày, tuần (tuần bắt đầu từ thứ Hai)
+BUCKET_STEPS = {
+    'H': pd.Timedelta(hours=1),
+    'D': pd.Timedelta(days=1),
+    'W': pd.Timedelta(weeks=1)
+}
+
+def bucket_for_days(days: int) -> str:
+    """Bucket phù hợp cho khoảng thời gian days: giờ, ngày hoặc tuần"""
+    if days <= TIMELINE_CONFIG['hourly_max_days']:
+        return 'H'
+    if days <= TIMELINE_CONFIG['daily_max_days']:
+        return 'D'
+    return 'W'
+
+def bucket_start(times: pd.Series, bucket: str) -> pd.Series:
+    """Thời điểm bắt đầu bucket của từng giá trị"""
+    if bucket == 'W':
+        day = times.dt.floor('D')
+        return day - pd.to_timedelta(day.dt.weekday, unit='D')
+    return times.dt.floor(BUCKET_STEPS[bucket])
+
+def window_start(days: int) -> pd.Timestamp:
+    """Bucket đầu tiên của cửa sổ days ngày gần nhất (đổi khi cửa sổ trượt sang bucket mới)"""
+    cutoff = pd.Series([pd.Timestamp(local_now() - timedelta(days=days))])
+    return bucket_start(cutoff, bucket_for_days(days)).iloc[0]
+
+def day_numbers(crawl_time: pd.Series, crawl_day: pd.Series = None) -> np.ndarray:
+    """
+    Số ngày kể từ DAY_EPOCH của từng bài
+
+    Lấy từ crawl_day (tính sẵn khi ghi); chỉ các dòng chưa có crawl_day
+    (document chưa chạy backfill_crawl_time) mới tính từ crawl_time.
+    """
+    if crawl_day is None:
+        crawl_day = pd.Series(np.nan, index=crawl_time.index)
+    days = crawl_day.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    missing = np.isnan(days)
+    if missing.any():
+        days[missing] = (crawl_time[missing].dt.floor('D') - DAY_EPOCH) // pd.Timedelta(days=1)
+    return days.astype(np.int64)
+
+def count_timeline(crawl_time: pd.Series, sentiment: pd.Series, bucket: str = 'D',
+                   crawl_day: pd.Series = None) -> pd.DataFrame:
+    """
+    Ma trận dày bucket x sentiment (cột TIMELINE_SENTIMENTS), bucket không có bài = 0
+
+    Bucket giờ tính bằng phép chia crawl_time theo độ dài bucket; bucket
+    ngày/tuần tính bằng số nguyên trên crawl_day. Sau đó một lần
+    np.bincount trên (bucket, sentiment) cho toàn bộ ma trận.
+    Sentiment ngoài TIMELINE_SENTIMENTS được tính là trung tính.
+    """
+    valid = crawl_time.notna()
+    if not valid.any():
+        return pd.DataFrame(columns=TIMELINE_SENTIMENTS, dtype=int)
+
+    step = BUCKET_STEPS[bucket]
+    if bucket == 'H':
+        starts = bucket_start(crawl_time[valid], bucket)
+        first = starts.min()
+        offsets = ((starts - first) // step).to_numpy(dtype=np.int64)
+    else:
+        days = day_numbers(crawl_time[valid], None if crawl_day is None else crawl_day[valid])
+        step_days = step.days
+        if bucket == 'W':
+            # DAY_EPOCH là thứ Năm: lùi về thứ Hai
+            days = days - (days + 3) % 7
+        first_day = int(days.min())
+        first = DAY_EPOCH + pd.Timedelta(days=first_day)
+        offsets = (days - first_day) // step_days
+    periods = int(offsets.max()) + 1
+
+    codes = pd.Categorical(sentiment[valid], categories=TIMELINE_SENTIMENTS).codes.astype(np.int64)
+    codes[codes < 0] = TIMELINE_SENTIMENTS.index(SENTIMENT_LABELS[1])
+
+    width = len(TIMELINE_SENTIMENTS)
+    counts = np.bincount(offsets * width + codes, minlength=periods * width).reshape(periods, width)
+    return pd.DataFrame(
+        counts,
+        index=pd.date_range(first, periods=periods, freq=step, name='bucket'),
+        columns=TIMELINE_SENTIMENTS
+    )
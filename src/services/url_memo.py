@@ -0,0 +1,156 @@
+"""
+Lưu kết quả phân tích URL để phân tích lại cùng một bài không cần tải/xử lý NLP lại
+"""
+from datetime import datetime, timedelta
+import logging
+from typing import Any, Dict, Optional
+
+from pymongo.errors import PyMongoError
+
+from src.database.db_manager import DatabaseManager
+from src.services.analysis_cache import analysis_cache
+from src.utils.helpers import normalize_url, utc_now
+from config.settings import URL_MEMO_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Collection lưu kết quả phân tích URL (TTL index trên expires_at)
+MEMO_COLLECTION = 'url_analyses'
+
+# Các trường của kết quả parse được lưu lại
+RESULT_FIELDS = ('title', 'content', 'summary', 'source', 'authors', 'publish_date', 'top_image', 'content_length')
+
+def _utc_now() -> datetime:
+    """Thời điểm hiện tại theo UTC, không tz (giống datetime MongoDB trả về)"""
+    return utc_now().replace(tzinfo=None)
+
+class URLAnalysisMemo:
+    """
+    Kết quả parse + preprocess + sentiment theo URL đã chuẩn hóa
+
+    Trong fresh_seconds sau lần phân tích, kết quả được trả về ngay. Sau đó
+    bài được kiểm tra lại bằng conditional GET (ETag/Last-Modified): nếu
+    server trả 304 thì dùng tiếp kết quả cũ, ngược lại phân tích lại.
+    Kết quả của version preprocessor/analyzer khác (đổi từ điển, tăng
+    VERSION) không được dùng. Document tự bị xóa sau ttl_days (TTL index).
+    """
+
+    def __init__(self, db_manager=None, url_parser=None, preprocessor=None, sentiment_analyzer=None,
+                 fresh_seconds: int = None, ttl_days: int = None):
+        self.db_manager = db_manager or DatabaseManager()
+        self.url_parser = url_parser
+        self.preprocessor = preprocessor
+        self.sentiment_analyzer = sentiment_analyzer
+        self.fresh_seconds = fresh_seconds or URL_MEMO_CONFIG['fresh_seconds']
+        self.ttl_days = ttl_days or URL_MEMO_CONFIG['ttl_days']
+
+    @property
+    def version(self) -> str:
+        """Version của preprocessor và analyzer đã tạo ra kết quả"""
+        return f"{self.preprocessor.version}:{self.sentiment_analyzer.version}"
+
+    def analyze(self, url: str) -> Dict[str, Any]:
+        """
+        Phân tích URL (dùng kết quả đã lưu nếu còn hợp lệ)
+
+        Returns: dict {'success', 'from_memo', 'result', 'processed', 'sentiment'}
+        hoặc {'success': False, 'error'}
+        """
+        url_key = normalize_url(url)
+        memo = self._load(url_key)
+        if memo is not None:
+            if _utc_now() < memo['fresh_until']:
+                return self._from_memo(memo)
+            if self.url_parser.is_modified(url, memo.get('etag'), memo.get('last_modified')) is False:
+                self._extend(url_key)
+                return self._from_memo(memo)
+
+        analysis = self._compute(url)
+        if analysis['success']:
+            self._store(url_key, url, analysis)
+        return analysis
+
+    def _compute(self, url: str) -> Dict[str, Any]:
+        result = self.url_parser.parse_url(url)
+        if not result['success']:
+            return {'success': False, 'error': result.get('error', 'Không thể trích xuất nội dung')}
+
+        full_text = f"{result['title']} {result['content']}"
+        processed = analysis_cache.preprocess(self.preprocessor, full_text)
+        sentiment = analysis_cache.sentiment(self.sentiment_analyzer, full_text)
+
+        return {
+            'success': True,
+            'from_memo': False,
+            'validators': result.get('validators') or {},
+            'result': {field: result[field] for field in RESULT_FIELDS if field in result},
+            'processed': {
+                'cleaned_text': processed['cleaned_text'],
+                'sectors': list(processed['sectors'])
+            },
+            'sentiment': {
+                'label': int(sentiment['label']),
+                'positive': float(sentiment['positive']),
+                'negative': float(sentiment['negative']),
+                'neutral': float(sentiment['neutral'])
+            }
+        }
+
+    def _collection(self):
+        return self.db_manager.config.get_collection(MEMO_COLLECTION)
+
+    def _load(self, url_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            collection = self._collection()
+            if collection is None:
+                return None
+            return collection.find_one({'url_key': url_key, 'version': self.version, 'expires_at': {'$gt': _utc_now()}})
+        except PyMongoError as e:
+            logger.warning(f"URL memo lookup failed: {e}")
+            return None
+
+    def _from_memo(self, memo: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'success': True,
+            'from_memo': True,
+            'result': memo['result'],
+            'processed': memo['processed'],
+            'sentiment': memo['sentiment']
+        }
+
+    def _expiry(self) -> Dict[str, datetime]:
+        # UTC vì TTL index của MongoDB so sánh theo UTC
+        now = _utc_now()
+        return {
+            'fresh_until': now + timedelta(seconds=self.fresh_seconds),
+            'expires_at': now + timedelta(days=self.ttl_days)
+        }
+
+    def _store(self, url_key: str, url: str, analysis: Dict[str, Any]) -> None:
+        # ETag/Last-Modified lấy từ chính response GET của parse_url
+        validators = analysis['validators']
+        document = {
+            'url_key': url_key,
+            'url': url,
+            'version': self.version,
+            'etag': validators.get('etag'),
+            'last_modified': validators.get('last_modified'),
+            'result': analysis['result'],
+            'processed': analysis['processed'],
+            'sentiment': analysis['sentiment'],
+            'analyzed_at': _utc_now(),
+            **self._expiry()
+        }
+        try:
+            collection = self._collection()
+            if collection is not None:
+                collection.replace_one({'url_key': url_key}, document, upsert=True)
+        except PyMongoError as e:
+            logger.warning(f"URL memo store failed: {e}")
+
+    def _extend(self, url_key: str) -> None:
+        """Bài chưa đổi (304): gia hạn kết quả đã lưu"""
+        try:
+            self._collection().update_one({'url_key': url_key}, {'$set': self._expiry()})
+        except PyMongoError as e:
+            logger.warning(f"URL memo refresh failed: {e}")
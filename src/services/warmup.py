@@ -0,0 +1,91 @@
+"""
+Nạp sẵn dữ liệu dashboard khi khởi động và trạng thái readiness của worker
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class Warmup:
+    """
+    Chạy các bước nạp dữ liệu ở thread nền sau khi app khởi động
+
+    Worker được coi là sẵn sàng (ready) khi mọi bước đã chạy xong, kể cả
+    khi có bước lỗi: callback vẫn tự tải dữ liệu khi cần, warmup chỉ để
+    người dùng đầu tiên không phải chờ.
+    """
+
+    def __init__(self):
+        self._steps: List[Tuple[str, Callable[[], Any]]] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._reset_state()
+
+    def _reset_state(self) -> None:
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.completed: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def add_step(self, name: str, func: Callable[[], Any]) -> None:
+        """Thêm một bước warmup (chạy theo thứ tự thêm vào)"""
+        self._steps.append((name, func))
+
+    def start(self) -> None:
+        """Start thread warmup (mỗi process một lần, chạy lại sau fork nếu chưa xong)"""
+        with self._lock:
+            if self._pid == os.getpid() and (self.ready or self._thread is not None):
+                return
+            self._reset_state()
+            self._pid = os.getpid()
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name='dashboard-warmup', daemon=True)
+            self._thread.start()
+
+    def mark_ready(self) -> None:
+        """Bỏ qua warmup (WARMUP_CONFIG['enabled'] = False)"""
+        self._pid = os.getpid()
+        self.ready = True
+
+    def _run(self) -> None:
+        for name, func in self._steps:
+            step_start = time.monotonic()
+            try:
+                func()
+                self.completed[name] = round(time.monotonic() - step_start, 3)
+            except Exception as e:
+                logger.error(f"Warmup step {name} failed: {e}")
+                self.errors[name] = str(e)
+
+        self.finished_at = time.time()
+        self.ready = True
+        logger.info(f"Warmup finished in {self.finished_at - self.started_at:.1f}s ({len(self.errors)} errors)")
+
+    def _restart_after_fork(self) -> None:
+        """Process con (gunicorn --preload) không có thread warmup của process cha"""
+        if self._thread is not None and not self.ready:
+            self._thread = None
+            self._pid = None
+            self.start()
+
+    def status(self) -> Dict[str, Any]:
+        """Trạng thái cho /readyz"""
+        return {
+            'ready': self.ready,
+            'pid': os.getpid(),
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'completed': dict(self.completed),
+            'errors': dict(self.errors)
+        }
+
+# Global warmup của process
+warmup = Warmup()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=warmup._restart_after_fork)
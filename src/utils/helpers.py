@@ -2,8 +2,15 @@
 Các hàm tiện ích
 """
 import re
-from datetime import datetime
+from datetime import datetime, timezone
 import hashlib
+import logging
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
 
 def clean_text(text):
     """Làm sạch văn bản"""
@@ -31,6 +38,41 @@ def generate_hash(text):
     """Tạo hash từ text để check duplicate"""
     return hashlib.md5(text.encode()).hexdigest()
 
+# Query params chỉ dùng để tracking, bỏ đi khi chuẩn hóa URL
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'zarsrc')
+
+def normalize_url(url):
+    """Chuẩn hóa URL để so khớp trùng lặp (bỏ fragment, tracking params, dấu / cuối)"""
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+    
+    if not isinstance(url, str) or not url.strip():
+        return ''
+    
+    parts = urlsplit(url.strip())
+    netloc = parts.netloc.lower()
+    if netloc.startswith('www.'):
+        netloc = netloc[4:]
+    
+    path = parts.path.rstrip('/') or '/'
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith(TRACKING_PARAMS)]
+    
+    return urlunsplit((parts.scheme.lower() or 'http', netloc, path, urlencode(sorted(query)), ''))
+
+def make_article_key(record):
+    """Khóa định danh bài viết: hash của link đã chuẩn hóa, hoặc hash nội dung nếu thiếu link"""
+    link = normalize_url(record.get('link'))
+    if link:
+        # http/https cùng trỏ tới một bài viết
+        return generate_hash(f"url:{link.split('://', 1)[-1]}")
+    
+    parts = [record.get(field) for field in ('title', 'content', 'summary')]
+    title, content, summary = [value if isinstance(value, str) else '' for value in parts]
+    text = f"{title} {content or summary}".strip()
+    if not text:
+        return None
+    return generate_hash(f"content:{text}")
+
 def format_date(date_obj):
     """Format datetime object"""
     if isinstance(date_obj, str):
@@ -41,6 +83,49 @@ def format_date(date_obj):
     
     return str(date_obj)
 
+def utc_now():
+    """Thời điểm hiện tại theo UTC (có tz, không phụ thuộc múi giờ của server)"""
+    return datetime.now(timezone.utc)
+
+def local_now():
+    """Thời điểm hiện tại theo DATABASE_CONFIG['timezone'], không tz (so sánh với crawl_time của frame)"""
+    from config.settings import DATABASE_CONFIG
+    return pd.Timestamp.now(tz=DATABASE_CONFIG['timezone']).tz_localize(None).to_pydatetime()
+
+def to_utc(value):
+    """
+    datetime/Timestamp/chuỗi -> datetime UTC không tz (dạng BSON date), None nếu không đọc được
+
+    Giá trị không có tz được hiểu theo DATABASE_CONFIG['timezone'].
+    """
+    from config.settings import DATABASE_CONFIG
+
+    try:
+        timestamp = pd.to_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if not isinstance(timestamp, pd.Timestamp) or pd.isna(timestamp):
+        return None
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize(DATABASE_CONFIG['timezone'])
+    return timestamp.tz_convert('UTC').tz_localize(None).to_pydatetime()
+
+# Mốc đánh số ngày của crawl_day
+DAY_EPOCH = pd.Timestamp('1970-01-01')
+
+def day_bucket(utc_time):
+    """Ngày (theo DATABASE_CONFIG['timezone']) của một datetime UTC không tz: số ngày kể từ DAY_EPOCH"""
+    from config.settings import DATABASE_CONFIG
+
+    local = pd.Timestamp(utc_time).tz_localize('UTC').tz_convert(DATABASE_CONFIG['timezone'])
+    return (local.tz_localize(None).normalize() - DAY_EPOCH).days
+
+def utc_to_local(times: pd.Series) -> pd.Series:
+    """Cột datetime UTC không tz (đọc từ MongoDB) -> giờ DATABASE_CONFIG['timezone'], không tz"""
+    from config.settings import DATABASE_CONFIG
+
+    return times.dt.tz_localize('UTC').dt.tz_convert(DATABASE_CONFIG['timezone']).dt.tz_localize(None)
+
 def truncate_text(text, length=100):
     """Cắt ngắn text"""
     if not text or len(text) <= length:
@@ -68,4 +153,84 @@ def calculate_sentiment_score(positive, negative, neutral):
     # Điểm từ -100 đến 100
     score = ((positive - negative) / total) * 100
     
-    return round(score, 2)
\ No newline at end of file
+    return round(score, 2)
+
+# Các ngành hợp lệ hiển thị trên dashboard
+VALID_SECTORS = ['Banking', 'Real Estate', 'Finance', 'Technology',
+                 'Manufacturing', 'Energy', 'Transportation',
+                 'Agriculture', 'Retail', 'Other']
+
+def normalize_sector(sector_value):
+    """Chuẩn hóa giá trị sector về ngành chính (ngành đầu tiên) - CẢI THIỆN"""
+    from config.settings import SECTOR_MAPPINGS
+    
+    try:
+        # Xử lý giá trị rỗng
+        if sector_value is None or sector_value != sector_value or sector_value == '' or sector_value == 'nan':
+            return 'Other'
+        
+        # Convert to string
+        sector_str = str(sector_value).strip()
+        
+        # Nếu là chuỗi rỗng sau khi strip
+        if not sector_str or sector_str == 'nan':
+            return 'Other'
+        
+        # Nếu chứa dấu phẩy (comma-separated), lấy ngành đầu tiên
+        if ',' in sector_str:
+            sectors_list = [s.strip() for s in sector_str.split(',')]
+            main_sector = sectors_list[0] if sectors_list else 'Other'
+        else:
+            main_sector = sector_str
+        
+        # Mapping tiếng Việt -> tiếng Anh (SECTOR_MAPPINGS có cả hai dạng)
+        mapped_sector = SECTOR_MAPPINGS.get(main_sector, main_sector)
+        
+        # Kiểm tra mapped_sector có hợp lệ không
+        if mapped_sector in VALID_SECTORS:
+            return mapped_sector
+        else:
+            return 'Other'
+            
+    except Exception as e:
+        logger.error(f"Error normalizing sector '{sector_value}': {e}")
+        return 'Other'
+
+def factorize_hashable(values: pd.Series):
+    """pd.factorize, giá trị list (sectors dạng mảng) được đổi sang tuple"""
+    try:
+        return pd.factorize(values)
+    except TypeError:
+        return pd.factorize(values.map(lambda value: tuple(value) if isinstance(value, list) else value))
+
+def normalize_sector_series(values: pd.Series) -> pd.Series:
+    """
+    normalize_sector cho cả một cột, trả về Series categorical (VALID_SECTORS)
+
+    Chỉ chuẩn hóa các giá trị khác nhau (factorize) rồi gán lại theo mã,
+    thay vì gọi normalize_sector cho từng dòng.
+    """
+    codes, uniques = factorize_hashable(values)
+    categories = pd.Index(VALID_SECTORS)
+    unique_sectors = [
+        normalize_sector(','.join(value) if isinstance(value, tuple) else value)
+        for value in uniques
+    ]
+    # Mã -1 (NaN/None) trỏ vào phần tử cuối là 'Other'
+    lookup = np.append(categories.get_indexer(unique_sectors), categories.get_loc('Other'))
+    return pd.Series(
+        pd.Categorical.from_codes(lookup[codes], categories=categories),
+        index=values.index,
+        name=values.name
+    )
+
+def sector_positions(sectors: pd.Series) -> Dict[str, np.ndarray]:
+    """
+    Vị trí dòng của từng ngành trong cột sector categorical (normalize_sector_series)
+
+    Dùng thay cho ma trận multi-hot bài x ngành: mỗi bài chỉ thuộc ngành chính
+    (cùng nghĩa với filter sector của MongoDB và aggregate), nên mỗi cột của
+    ma trận chính là mảng vị trí của một ngành. groupby().indices chỉ duyệt
+    mã categorical một lần; ngành không có bài nào không có key.
+    """
+    return sectors.groupby(sectors, sort=False, observed=True).indices
@@ -0,0 +1,84 @@
+"""
+Cấu hình logging: ghi file/console ở thread riêng, payload debug chỉ dựng khi cần
+"""
+import atexit
+import logging
+import logging.config
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional
+
+from config.settings import LOG_CONFIG
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    Đưa record vào queue, không format ở thread gọi log
+
+    QueueHandler mặc định format message trước khi đưa vào queue (để có thể
+    pickle). Queue ở đây nằm trong process nên giữ nguyên record, việc
+    format (kể cả các lazy payload) diễn ra ở thread của QueueListener.
+    """
+
+    def prepare(self, record):
+        return record
+
+class lazy:
+    """
+    Tham số log chỉ được tính khi message thực sự được format
+
+    logger.debug("Sample:\\n%s", lazy(lambda: df.head(20))) không dựng chuỗi
+    nào nếu DEBUG đang tắt.
+    """
+
+    __slots__ = ('func',)
+
+    def __init__(self, func: Callable[[], Any]):
+        self.func = func
+
+    def __str__(self):
+        return str(self.func())
+
+_listener: Optional[QueueListener] = None
+
+def configure_logging(config: Dict[str, Any] = None) -> None:
+    """
+    Áp dụng LOG_CONFIG, rồi chuyển các handler của root logger ra sau một
+    QueueListener: thread xử lý request chỉ đưa record vào queue, ghi file
+    và format diễn ra ở thread nền.
+    """
+    global _listener
+    logging.config.dictConfig(config or LOG_CONFIG)
+
+    root = logging.getLogger()
+    handlers = [handler for handler in root.handlers if not isinstance(handler, QueueHandler)]
+    if not handlers:
+        return
+
+    log_queue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(_InProcessQueueHandler(log_queue))
+
+    if _listener is not None:
+        _listener.stop()
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging() -> None:
+    """Ghi nốt các record còn trong queue rồi dừng listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _restart_after_fork() -> None:
+    """Process con (gunicorn --preload) không có thread listener của process cha"""
+    if _listener is not None and _listener._thread is not None:
+        _listener._thread = None
+        _listener.start()
+
+atexit.register(stop_logging)
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_after_fork)
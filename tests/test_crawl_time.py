@@ -0,0 +1,61 @@
+"""Chuẩn hóa crawl_time: backfill_crawl_time rồi migrate_schema không dời giờ hai lần"""
+import os
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import DATABASE_CONFIG
+from scripts.backfill_crawl_time import backfill_fields
+from scripts.migrate_schema import migration_update
+from src.utils.helpers import DAY_EPOCH
+
+def apply_set(doc, update):
+    """Áp dụng $set/$unset lên một dict như MongoDB"""
+    doc = dict(doc)
+    doc.update(update.get('$set', {}))
+    for field in update.get('$unset', {}):
+        doc.pop(field, None)
+    return doc
+
+@mock.patch.dict(DATABASE_CONFIG, {'timezone': 'Asia/Ho_Chi_Minh'})
+class MigrateAfterBackfillTest(unittest.TestCase):
+    def setUp(self):
+        # Document cũ: crawl_time lưu bằng datetime.now() theo giờ địa phương
+        self.legacy = {
+            '_id': 1,
+            'link': 'https://example.com/bai-viet',
+            'title': 'Bài viết',
+            'content': 'Nội dung bài viết',
+            'sectors': 'Ngân hàng',
+            'predicted_sentiment': 'Tích cực',
+            'crawl_time': datetime(2025, 11, 10, 9, 0),
+        }
+        self.expected_day = (datetime(2025, 11, 10) - DAY_EPOCH).days
+
+    def test_backfill_converts_local_time_to_utc(self):
+        doc = apply_set(self.legacy, {'$set': backfill_fields(dict(self.legacy))})
+
+        self.assertEqual(doc['crawl_time'], datetime(2025, 11, 10, 2, 0))
+        self.assertEqual(doc['crawl_day'], self.expected_day)
+
+    def test_migrate_after_backfill_keeps_crawl_time(self):
+        backfilled = apply_set(self.legacy, {'$set': backfill_fields(dict(self.legacy))})
+        update, _ = migration_update(dict(backfilled))
+        migrated = apply_set(backfilled, update)
+
+        self.assertEqual(migrated['crawl_time'], datetime(2025, 11, 10, 2, 0))
+        self.assertEqual(migrated['crawl_day'], self.expected_day)
+
+    def test_backfill_after_migrate_keeps_crawl_time(self):
+        update, _ = migration_update(dict(self.legacy))
+        migrated = apply_set(self.legacy, update)
+        backfilled = apply_set(migrated, {'$set': backfill_fields(dict(migrated))})
+
+        self.assertEqual(backfilled['crawl_time'], datetime(2025, 11, 10, 2, 0))
+        self.assertEqual(backfilled['crawl_day'], self.expected_day)
+
+if __name__ == '__main__':
+    unittest.main()